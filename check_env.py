@@ -1,5 +1,13 @@
+import argparse
+import json
 import os
+import platform
+import shutil
+import time
+from datetime import datetime
+
 import cv2
+import numpy as np
 import torch
 from ultralytics import YOLO
 
@@ -89,5 +97,196 @@ def check_environment():
     print("   你的开发环境非常健康，可以开始编写核心算法了。")
 
 
+# ----------------------------------------------------------------------
+# 硬件标定 (--calibrate)
+# 在目标机器上用合成帧实测各项参数，结果写入 data/runtime_profile.json，
+# PoseDetector / AIWorker / 推理服务启动时读取 (见 src/runtime_profile.py)
+# ----------------------------------------------------------------------
+EXPORT_SUFFIX = {"onnx": ".onnx", "openvino": "_openvino_model", "engine": ".engine"}
+
+
+def _synthetic_frames(frame_size, count=8, seed=0):
+    """带噪声和色块的合成帧：不依赖测试视频，也不会因为纯色输入让 NMS 阶段耗时失真"""
+    w, h = frame_size
+    rng = np.random.default_rng(seed)
+    frames = []
+    for _ in range(count):
+        f = rng.integers(0, 256, (h, w, 3), dtype=np.uint8)
+        for _ in range(6):
+            x, y = int(rng.integers(0, w - 64)), int(rng.integers(0, h - 64))
+            cv2.rectangle(f, (x, y), (x + int(rng.integers(32, w // 4)), y + int(rng.integers(32, h // 3))),
+                          rng.integers(0, 256, 3).tolist(), -1)
+        frames.append(f)
+    return frames
+
+
+def _fps(fn, frames, iters, per_call=1):
+    """预热后计时 iters 次调用，返回每秒处理的帧数"""
+    for f in frames[:2]:
+        fn(f)
+    t0 = time.perf_counter()
+    for i in range(iters):
+        fn(frames[i % len(frames)])
+    return iters * per_call / (time.perf_counter() - t0)
+
+
+def _export_weights(model_path, backend, imgsz):
+    """导出为指定后端 (输入尺寸在导出时固定，每个尺寸一份)，已导出过则直接复用"""
+    stem = os.path.splitext(os.path.basename(model_path))[0]
+    out_dir = os.path.join("models", "exports")
+    target = os.path.join(out_dir, f"{stem}_{imgsz}{EXPORT_SUFFIX[backend]}")
+    if os.path.exists(target):
+        return target
+    # dynamic=True 让 ONNX 支持可变批大小，批量吞吐测试才有意义
+    exported = YOLO(model_path).export(format=backend, imgsz=imgsz, dynamic=backend == "onnx", verbose=False)
+    os.makedirs(out_dir, exist_ok=True)
+    shutil.move(str(exported), target)
+    return target
+
+
+def calibrate(args):
+    from src.core_inference import PoseDetector
+
+    device = 'cuda' if torch.cuda.is_available() else 'cpu'
+    frames = _synthetic_frames(args.frame_size)
+    cpu_count = os.cpu_count() or 1
+    hardware = {
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": cpu_count,
+        "gpu": torch.cuda.get_device_name(0) if device == 'cuda' else None,
+        "torch": torch.__version__,
+        "opencv": cv2.__version__,
+    }
+    print("🔧 开始硬件标定")
+    print(f"   设备: {device.upper()}  CPU: {cpu_count} 核  合成帧: {args.frame_size[0]}x{args.frame_size[1]}")
+    measurements = {"torch_threads": {}, "opencv_threads": {}, "backends": {}, "batch": {}}
+
+    thread_options = sorted({t for t in args.threads if t <= cpu_count} | {cpu_count})
+    detector = PoseDetector(args.model, device=device, imgsz=args.imgsz[0])
+
+    # 1. torch 线程数 (只影响 CPU 推理；GPU 上前向不占用 CPU 线程池)
+    if device == 'cpu':
+        print("\n1. [torch 线程数]")
+        for t in thread_options:
+            torch.set_num_threads(t)
+            fps = _fps(detector.infer, frames, args.iters)
+            measurements["torch_threads"][t] = round(fps, 2)
+            print(f"   {t:>3} 线程: {fps:6.2f} FPS")
+        torch_threads = max(measurements["torch_threads"], key=measurements["torch_threads"].get)
+    else:
+        torch_threads = torch.get_num_threads()
+    torch.set_num_threads(torch_threads)
+
+    # 2. OpenCV 线程数 (解码后的缩放 / 颜色转换 / 绘制)；与推理并行运行，线程过多反而抢占推理
+    print("\n2. [OpenCV 线程数]")
+    canvas = np.empty_like(frames[0])
+    rgb = np.empty_like(frames[0])
+
+    def cv_work(f):
+        np.copyto(canvas, f)
+        cv2.resize(f, (args.imgsz[0], args.imgsz[0]))
+        cv2.cvtColor(canvas, cv2.COLOR_BGR2RGB, dst=rgb)
+        detector.infer(f)
+
+    for t in thread_options:
+        cv2.setNumThreads(t)
+        fps = _fps(cv_work, frames, args.iters)
+        measurements["opencv_threads"][t] = round(fps, 2)
+        print(f"   {t:>3} 线程: {fps:6.2f} FPS")
+    opencv_threads = max(measurements["opencv_threads"], key=measurements["opencv_threads"].get)
+    cv2.setNumThreads(opencv_threads)
+
+    # 3. 推理后端 × 输入尺寸
+    print("\n3. [推理后端 × 输入尺寸]")
+    candidates = []  # (fps, backend, imgsz, weights)
+    for backend in args.backends:
+        for imgsz in args.imgsz:
+            key = f"{backend}@{imgsz}"
+            try:
+                if backend == "pt":
+                    weights, det = args.model, detector
+                else:
+                    weights = _export_weights(args.model, backend, imgsz)
+                    det = PoseDetector(weights, device=device, imgsz=imgsz)
+                fps = _fps(lambda f: det.infer(f, imgsz), frames, args.iters)
+            except Exception as e:
+                measurements["backends"][key] = None
+                print(f"   {key:<16} ❌ 跳过 ({e.__class__.__name__}: {e})")
+                continue
+            measurements["backends"][key] = round(fps, 2)
+            candidates.append((fps, backend, imgsz, weights))
+            print(f"   {key:<16} {fps:6.2f} FPS")
+    if not candidates:
+        print("❌ 没有可用的推理后端，标定中止")
+        return
+
+    # 达到目标帧率的组合中取输入尺寸最大的 (精度优先)；都达不到时取最快的
+    fast_enough = [c for c in candidates if c[0] >= args.target_fps]
+    fps, backend, imgsz, weights = (max(fast_enough, key=lambda c: (c[2], c[0])) if fast_enough
+                                    else max(candidates))
+    det = detector if backend == "pt" else PoseDetector(weights, device=device, imgsz=imgsz)
+    if det is detector:
+        detector.imgsz = imgsz
+
+    # 4. 批大小 (推理服务把多路画面拼成一批)：取单帧吞吐最高的批大小
+    print(f"\n4. [批大小] ({backend}@{imgsz})")
+    batch_size = 1
+    best = 0.0
+    for b in args.batch:
+        try:
+            batch = [frames[i % len(frames)] for i in range(b)]
+            bfps = _fps(lambda _: det.infer_batch(batch, imgsz), [None], max(1, args.iters // b), per_call=b)
+        except Exception as e:
+            print(f"   batch {b:>2}: ❌ 跳过 ({e.__class__.__name__})")
+            break
+        measurements["batch"][b] = round(bfps, 2)
+        print(f"   batch {b:>2}: {bfps:6.2f} 帧/秒")
+        if bfps > best * 1.05:  # 提升不足 5% 时不再增大批次，避免白白增加排队延迟
+            best, batch_size = bfps, b
+
+    profile = {
+        "generated": datetime.now().isoformat(timespec="seconds"),
+        "hardware": hardware,
+        "device": device,
+        "torch_threads": int(torch_threads),
+        "opencv_threads": int(opencv_threads),
+        "backend": backend,
+        "imgsz": int(imgsz),
+        "batch_size": int(batch_size),
+        "source_model": os.path.basename(args.model),
+        "weights": None if backend == "pt" else weights.replace(os.sep, "/"),
+        "expected_fps": round(fps, 2),
+        "measurements": measurements,
+    }
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(profile, f, ensure_ascii=False, indent=2)
+    print("=" * 60)
+    print(f"✅ 标定完成: {backend}@{imgsz}  batch={batch_size}  torch 线程={torch_threads}  "
+          f"OpenCV 线程={opencv_threads}  预计 {fps:.1f} FPS")
+    print(f"   已写入 {args.out}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="环境自检 / 硬件标定")
+    parser.add_argument("--calibrate", action="store_true", help="实测本机最佳运行参数并写入运行档案")
+    parser.add_argument("--model", default="models/yolo11n-pose.pt")
+    parser.add_argument("--imgsz", type=int, nargs="+", default=[640, 480, 320], help="候选输入尺寸 (第一个用于线程测试)")
+    parser.add_argument("--batch", type=int, nargs="+", default=[1, 2, 4, 8], help="候选批大小")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8], help="候选线程数 (另外总会测试全部核心)")
+    parser.add_argument("--backends", nargs="+", default=["pt", "onnx", "openvino"],
+                        choices=["pt", *EXPORT_SUFFIX], help="候选推理后端 (导出失败或未安装的会被跳过)")
+    parser.add_argument("--frame-size", type=int, nargs=2, default=[1280, 720], metavar=("W", "H"))
+    parser.add_argument("--iters", type=int, default=30, help="每项测量的推理次数")
+    parser.add_argument("--target-fps", type=float, default=15.0, help="选择输入尺寸时要求达到的帧率")
+    parser.add_argument("--out", default="data/runtime_profile.json")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    check_environment()
\ No newline at end of file
+    args = parse_args()
+    if args.calibrate:
+        calibrate(args)
+    else:
+        check_environment()
\ No newline at end of file
@@ -0,0 +1,322 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Asset manager shared by scripts/download_assets.py and setup_resources.py.
+#
+# scripts/assets.json lists every large file with its release file name, checkout
+# path and SHA-256. Downloads go into a content-addressed cache shared by all
+# checkouts on the machine (<cache>/sha256/ab/abcd...); the checkout path is a
+# hardlink to the cached blob, so provisioning another checkout (or re-running CI)
+# is a hash check plus a link. Large files are fetched as parallel HTTP ranges;
+# finished ranges are recorded next to the partial file, so an interrupted
+# download resumes where it stopped. Servers without range support fall back to
+# a single stream. Assets without a pinned hash are keyed by URL + server-reported
+# size (<cache>/urls/...), so they are not re-downloaded for every checkout either.
+#
+#   cache:  $WAREHOUSE_ASSET_CACHE, default ~/.cache/warehouse_assets
+#   mirror: AssetManager(base_url=...) / --base-url replaces the manifest base URL
+
+ROOT = Path(__file__).resolve().parents[1]
+MANIFEST = Path(__file__).resolve().with_name("assets.json")
+DEFAULT_CACHE = Path(os.environ.get("WAREHOUSE_ASSET_CACHE", Path.home() / ".cache" / "warehouse_assets"))
+CHUNK_SIZE = 8 * 2 ** 20
+READ_SIZE = 2 ** 20
+
+
+class AssetError(RuntimeError):
+    pass
+
+
+def load_manifest(path: Path = MANIFEST) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest: dict, path: Path = MANIFEST) -> None:
+    tmp = Path(f"{path}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+        f.write("\n")
+    os.replace(tmp, path)
+
+
+def sha256_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while block := f.read(READ_SIZE):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _write_json(path: Path, data: dict) -> None:
+    tmp = Path(f"{path}.tmp")
+    tmp.write_text(json.dumps(data), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+class AssetManager:
+    def __init__(self, manifest_path: Path = MANIFEST, cache_dir: Path = DEFAULT_CACHE,
+                 base_url: str | None = None, workers: int = 4, chunk_size: int = CHUNK_SIZE,
+                 root: Path = ROOT, timeout: float = 30.0, retries: int = 3):
+        self.manifest_path = Path(manifest_path)
+        self.manifest = load_manifest(self.manifest_path)
+        self.cache_dir = Path(cache_dir)
+        self.base_url = base_url or self.manifest["base_url"]
+        if not self.base_url.endswith("/"):
+            self.base_url += "/"
+        self.workers = max(1, workers)
+        self.chunk_size = chunk_size
+        self.root = Path(root)
+        self.timeout = timeout
+        self.retries = retries
+
+    @property
+    def assets(self) -> dict:
+        return self.manifest["assets"]
+
+    def url(self, key: str) -> str:
+        return self.base_url + self.assets[key]["file"]
+
+    def blob_path(self, digest: str) -> Path:
+        return self.cache_dir / "sha256" / digest[:2] / digest
+
+    def _url_record_path(self, url: str) -> Path:
+        return self.cache_dir / "urls" / f"{hashlib.sha256(url.encode()).hexdigest()}.json"
+
+    def _cached_by_url(self, url: str, size: int | None) -> str | None:
+        """sha256 of a blob previously downloaded from url, if the server still reports the same size"""
+        if size is None:
+            return None
+        try:
+            record = json.loads(self._url_record_path(url).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if record.get("url") != url or record.get("size") != size:
+            return None
+        digest = record.get("sha256")
+        return digest if digest and self.blob_path(digest).exists() else None
+
+    def _record_url(self, url: str, size: int, digest: str) -> None:
+        path = self._url_record_path(url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _write_json(path, {"url": url, "size": size, "sha256": digest})
+
+    # ------------------------------------------------------------------
+    # provisioning
+    # ------------------------------------------------------------------
+    def ensure(self, key: str, strict: bool = False) -> tuple[Path, str]:
+        """
+        Make the asset present and verified at its checkout path.
+        Returns (path, sha256). strict=True refuses assets without a pinned hash.
+        Unpinned assets are reused from the cache only when the same URL still reports
+        the same size; that catches a re-uploaded release file, not a tampered one.
+        """
+        spec = self.assets[key]
+        dst = self.root / spec["path"]
+        pinned = spec.get("sha256")
+        if strict and not pinned:
+            raise AssetError(f"{key}: no sha256 in {self.manifest_path.name} (run download_assets.py --pin)")
+
+        if pinned:
+            blob = self.blob_path(pinned)
+            if dst.exists() and blob.exists() and os.path.samefile(dst, blob):
+                print(f"[OK]    {key}: {spec['path']} (cached)")
+                return dst, pinned
+            if dst.exists():
+                if sha256_file(dst) == pinned:
+                    self._store(dst, pinned, keep_source=True)
+                    print(f"[OK]    {key}: {spec['path']} (verified)")
+                    return dst, pinned
+                print(f"[BAD]   {key}: {spec['path']} does not match the manifest, replacing")
+            if blob.exists():
+                self._link(blob, dst)
+                print(f"[CACHE] {key}: {spec['path']} <- {blob}")
+                return dst, pinned
+        elif dst.exists():
+            print(f"[WARN]  {key}: {spec['path']} present but unpinned, not verified")
+            return dst, sha256_file(dst)
+
+        url = self.url(key)
+        probe = self._probe(url)
+        if not pinned:
+            digest = self._cached_by_url(url, probe[0])
+            if digest:
+                blob = self.blob_path(digest)
+                self._link(blob, dst)
+                print(f"[CACHE] {key}: {spec['path']} <- {blob} (unpinned, matched by URL and size)")
+                return dst, digest
+
+        part = self._download(key, probe)
+        digest = sha256_file(part)
+        if pinned and digest != pinned:
+            self._discard(part)
+            raise AssetError(f"{key}: sha256 mismatch (expected {pinned}, got {digest})")
+        if spec.get("size") and part.stat().st_size != spec["size"]:
+            self._discard(part)
+            raise AssetError(f"{key}: size mismatch (expected {spec['size']}, got {part.stat().st_size})")
+        size = part.stat().st_size
+        if not pinned:
+            print(f"[WARN]  {key}: downloaded without a pinned hash (sha256 {digest}); "
+                  f"run download_assets.py --pin to verify future downloads")
+        blob = self._store(part, digest, keep_source=False)
+        if not pinned:
+            self._record_url(url, size, digest)
+        self._link(blob, dst)
+        return dst, digest
+
+    def pin(self, keys: list[str]) -> None:
+        """Record sha256/size of the current files (downloading missing ones) in the manifest."""
+        for key in keys:
+            spec = self.assets[key]
+            if spec.get("sha256"):
+                self.ensure(key)
+                continue
+            path, digest = self.ensure(key)
+            spec["sha256"] = digest
+            spec["size"] = path.stat().st_size
+            self._store(path, digest, keep_source=True)
+            print(f"[PIN]   {key}: {digest} ({spec['size']} bytes)")
+        save_manifest(self.manifest, self.manifest_path)
+
+    def _store(self, src: Path, digest: str, keep_source: bool) -> Path:
+        """Put a verified file into the cache (hardlink when keeping the source)."""
+        blob = self.blob_path(digest)
+        if blob.exists():
+            if not keep_source:
+                src.unlink()
+            return blob
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        tmp = Path(f"{blob}.tmp{os.getpid()}")
+        if keep_source:
+            try:
+                os.link(src, tmp)
+            except OSError:
+                shutil.copy2(src, tmp)
+        else:
+            os.replace(src, tmp)
+        # shared by every checkout through hardlinks: an in-place edit would corrupt all of them
+        os.chmod(tmp, 0o444)
+        os.replace(tmp, blob)
+        return blob
+
+    @staticmethod
+    def _link(blob: Path, dst: Path) -> None:
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dst.with_name(f".{dst.name}.tmp{os.getpid()}")
+        try:
+            os.link(blob, tmp)
+        except OSError:  # cache on another filesystem
+            shutil.copyfile(blob, tmp)
+        os.replace(tmp, dst)
+
+    # ------------------------------------------------------------------
+    # download
+    # ------------------------------------------------------------------
+    def _partial_path(self, key: str) -> Path:
+        name = hashlib.sha256(self.url(key).encode()).hexdigest()[:16]
+        return self.cache_dir / "partial" / f"{self.assets[key]['file']}.{name}.part"
+
+    @staticmethod
+    def _discard(part: Path) -> None:
+        part.unlink(missing_ok=True)
+        Path(f"{part}.json").unlink(missing_ok=True)
+
+    def _open(self, url: str, start: int | None = None, end: int | None = None):
+        req = urllib.request.Request(url)
+        if start is not None:
+            req.add_header("Range", f"bytes={start}-{end}")
+        return urllib.request.urlopen(req, timeout=self.timeout)  # nosec
+
+    def _probe(self, url: str) -> tuple[int | None, bool]:
+        """(size, accepts ranges) from a one-byte range request"""
+        with self._open(url, 0, 0) as resp:
+            if resp.status == 206:
+                total = resp.headers.get("Content-Range", "").rpartition("/")[2]
+                if total.isdigit():
+                    return int(total), True
+            length = resp.headers.get("Content-Length")
+            return (int(length) if length and resp.status == 200 else None), False
+
+    def _download(self, key: str, probe: tuple[int | None, bool] | None = None) -> Path:
+        url = self.url(key)
+        part = self._partial_path(key)
+        part.parent.mkdir(parents=True, exist_ok=True)
+        size, ranged = probe or self._probe(url)
+        t0 = time.perf_counter()
+        if ranged and size > self.chunk_size:
+            fetched = self._download_ranges(url, part, size)
+        else:
+            fetched = self._download_stream(url, part)
+        dt = time.perf_counter() - t0
+        print(f"[GET]   {key}: {fetched / 2 ** 20:.1f} MiB in {dt:.1f}s "
+              f"({fetched / 2 ** 20 / max(dt, 1e-6):.1f} MiB/s) <- {url}")
+        return part
+
+    def _download_stream(self, url: str, part: Path) -> int:
+        """Single stream (server without range support or small file): no resume."""
+        self._discard(part)
+        with self._open(url) as resp, open(part, "wb") as f:
+            shutil.copyfileobj(resp, f, READ_SIZE)
+        return part.stat().st_size
+
+    def _download_ranges(self, url: str, part: Path, size: int) -> int:
+        state_path = Path(f"{part}.json")
+        state = {"url": url, "size": size, "chunk": self.chunk_size, "done": []}
+        if part.exists() and state_path.exists():
+            try:
+                saved = json.loads(state_path.read_text(encoding="utf-8"))
+            except ValueError:
+                saved = {}
+            if all(saved.get(k) == state[k] for k in ("url", "size", "chunk")):
+                state = saved
+        else:
+            self._discard(part)
+        with open(part, "ab") as f:
+            f.truncate(size)
+
+        n_chunks = -(-size // self.chunk_size)
+        done = set(state["done"])
+        todo = [i for i in range(n_chunks) if i not in done]
+        if done:
+            print(f"[RESUME] {part.name}: {len(done)}/{n_chunks} chunks already on disk")
+        lock = threading.Lock()
+
+        def fetch(i: int) -> int:
+            start = i * self.chunk_size
+            end = min(size, start + self.chunk_size) - 1
+            for attempt in range(self.retries + 1):
+                try:
+                    with self._open(url, start, end) as resp, open(part, "r+b") as f:
+                        if resp.status != 206:
+                            raise AssetError(f"server ignored range request (HTTP {resp.status})")
+                        f.seek(start)
+                        written = 0
+                        while block := resp.read(READ_SIZE):
+                            f.write(block)
+                            written += len(block)
+                    if written != end - start + 1:
+                        raise AssetError(f"short read on chunk {i} ({written} of {end - start + 1} bytes)")
+                    break
+                except (OSError, AssetError):
+                    if attempt == self.retries:
+                        raise
+                    time.sleep(2 ** attempt)
+            with lock:
+                done.add(i)
+                state["done"] = sorted(done)
+                _write_json(state_path, state)
+            return end - start + 1
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            fetched = sum(pool.map(fetch, todo))
+        state_path.unlink()
+        return fetched
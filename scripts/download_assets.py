@@ -1,35 +1,19 @@
 from __future__ import annotations
 import argparse
 from pathlib import Path
-import urllib.request
+
+from asset_manager import DEFAULT_CACHE, MANIFEST, AssetError, AssetManager
 
 # Large files are provided via GitHub Releases (not committed to the repo).
 # - model: weights for inference
 # - sample_video: input video used for quick start
 # - ui_demo: screen-recorded UI demo video (for preview)
-ASSETS = {
-    "model": {
-        "path": "models/yolo11n-pose.pt",
-        "url": "https://github.com/Bkp-126/Warehouse_Shelf_Posture_Recognition/releases/download/v0.1.0/yolo11n-pose.pt",
-        "desc": "YOLOv11 pose weights (baseline)",
-    },
-    "sample_video": {
-        "path": "data/video_1.mp4",
-        "url": "https://github.com/Bkp-126/Warehouse_Shelf_Posture_Recognition/releases/download/v0.1.0/video_1.mp4",
-        "desc": "Sample input video for quick start",
-    },
-    "ui_demo": {
-        "path": "output/ui_demo.mp4",
-        "url": "https://github.com/Bkp-126/Warehouse_Shelf_Posture_Recognition/releases/download/v0.1.0/ui_demo.mp4",
-        "desc": "UI demo video (screen recording)",
-    },
-}
-
-
-def download(url: str, dst: Path) -> None:
-    dst.parent.mkdir(parents=True, exist_ok=True)
-    print(f"Downloading -> {dst}")
-    urllib.request.urlretrieve(url, dst)  # nosec
+# The file list, release base URL and SHA-256 pins live in scripts/assets.json;
+# downloading, verification and the shared cache are handled by asset_manager.py.
+#
+#   python scripts/download_assets.py --all
+#   python scripts/download_assets.py --model --base-url http://mirror.local/assets/
+#   python scripts/download_assets.py --all --pin          (record hashes after a release)
 
 
 def main() -> int:
@@ -40,6 +24,14 @@ def main() -> int:
     p.add_argument("--video", action="store_true", help="Download sample input video (data/video_1.mp4)")
     p.add_argument("--ui-demo", action="store_true", help="Download UI demo video (output/ui_demo.mp4)")
     p.add_argument("--all", action="store_true", help="Download all assets")
+    p.add_argument("--base-url", default=None, help="Mirror URL replacing the release base URL in the manifest")
+    p.add_argument("--cache-dir", type=Path, default=DEFAULT_CACHE,
+                   help="Shared content-addressed cache (env WAREHOUSE_ASSET_CACHE)")
+    p.add_argument("--workers", type=int, default=4, help="Parallel range requests per file")
+    p.add_argument("--chunk-mb", type=float, default=8.0, help="Range size in MiB")
+    p.add_argument("--manifest", type=Path, default=MANIFEST)
+    p.add_argument("--strict", action="store_true", help="Fail on assets without a pinned sha256")
+    p.add_argument("--pin", action="store_true", help="Write sha256/size of the selected assets into the manifest")
     args = p.parse_args()
 
     targets: list[str] = []
@@ -53,13 +45,17 @@ def main() -> int:
         if args.ui_demo:
             targets.append("ui_demo")
 
-    for key in targets:
-        url = ASSETS[key]["url"]
-        if not url:
-            print(f"[SKIP] {key}: url is empty. Please set it in scripts/download_assets.py")
-            continue
-        dst = Path(ASSETS[key]["path"])
-        download(url, dst)
+    manager = AssetManager(args.manifest, args.cache_dir, args.base_url, args.workers,
+                           chunk_size=int(args.chunk_mb * 2 ** 20))
+    try:
+        if args.pin:
+            manager.pin(targets)
+        else:
+            for key in targets:
+                manager.ensure(key, strict=args.strict)
+    except (AssetError, OSError) as e:
+        print(f"[FAIL] {e}")
+        return 1
 
     print("Done.")
     return 0
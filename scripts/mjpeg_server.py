@@ -0,0 +1,114 @@
+from __future__ import annotations
+import argparse
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+import numpy as np
+
+# Local stand-in for a network camera: serves a looped video file (or synthetic
+# frames) as an MJPEG stream over HTTP, so the stream layer (src/stream_source.py)
+# can be exercised without real hardware:
+#   python scripts/mjpeg_server.py --video data/video_1.mp4 --fps 25 --port 8554
+#   python src/ui/main_window.py --source http://127.0.0.1:8554/stream.mjpg
+# --drop-every simulates a flaky link by closing the connection periodically.
+
+
+class FrameSource:
+    """Produces JPEG-encoded frames at a fixed rate, shared by all clients."""
+
+    def __init__(self, video: str | None, fps: float, width: int, height: int, quality: int) -> None:
+        self.cap = cv2.VideoCapture(video) if video else None
+        self.fps = fps
+        self.size = (width, height)
+        self.quality = quality
+        self.cond = threading.Condition()
+        self.jpeg = b""
+        self.seq = 0
+        threading.Thread(target=self._loop, daemon=True).start()
+
+    def _next_frame(self) -> np.ndarray:
+        if self.cap is not None:
+            ok, frame = self.cap.read()
+            if not ok:
+                self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                ok, frame = self.cap.read()
+            if ok:
+                return frame
+        w, h = self.size
+        frame = np.full((h, w, 3), 40, np.uint8)
+        x = int((self.seq * 8) % w)
+        cv2.circle(frame, (x, h // 2), 40, (255, 255, 255), -1)
+        return frame
+
+    def _loop(self) -> None:
+        interval = 1.0 / self.fps
+        next_t = time.perf_counter()
+        while True:
+            frame = self._next_frame()
+            # Wall-clock stamp so end-to-end latency can be read off the GUI.
+            cv2.putText(frame, f"{self.seq} {time.strftime('%H:%M:%S')}.{int(time.time() * 1000) % 1000:03d}",
+                        (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
+            ok, buf = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+            with self.cond:
+                self.jpeg = buf.tobytes()
+                self.seq += 1
+                self.cond.notify_all()
+            next_t += interval
+            time.sleep(max(0.0, next_t - time.perf_counter()))
+
+    def wait_next(self, last_seq: int) -> tuple[int, bytes]:
+        with self.cond:
+            self.cond.wait_for(lambda: self.seq != last_seq, timeout=2.0)
+            return self.seq, self.jpeg
+
+
+def make_handler(source: FrameSource, drop_every: float):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", "multipart/x-mixed-replace; boundary=frame")
+            self.end_headers()
+            started = time.time()
+            seq = -1
+            try:
+                while not drop_every or time.time() - started < drop_every:
+                    seq, jpeg = source.wait_next(seq)
+                    self.wfile.write(b"--frame\r\nContent-Type: image/jpeg\r\n")
+                    self.wfile.write(f"Content-Length: {len(jpeg)}\r\n\r\n".encode())
+                    self.wfile.write(jpeg + b"\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def log_message(self, fmt, *args) -> None:
+            print(f"[mjpeg] {self.address_string()} {fmt % args}")
+
+    return Handler
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Serve a video file or synthetic frames as a local MJPEG stream.")
+    p.add_argument("--video", default=None, help="Video file to loop (default: synthetic frames)")
+    p.add_argument("--fps", type=float, default=25.0)
+    p.add_argument("--width", type=int, default=1280, help="Synthetic frame width")
+    p.add_argument("--height", type=int, default=720, help="Synthetic frame height")
+    p.add_argument("--quality", type=int, default=80, help="JPEG quality")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8554)
+    p.add_argument("--drop-every", type=float, default=0.0, help="Close each connection after N seconds (0 = never)")
+    args = p.parse_args()
+
+    source = FrameSource(args.video, args.fps, args.width, args.height, args.quality)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(source, args.drop_every))
+    server.daemon_threads = True
+    print(f"Serving MJPEG on http://{args.host}:{args.port}/stream.mjpg")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,107 @@
+from __future__ import annotations
+import argparse
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Startup-time profile broken down by import.
+# Each phase is imported in a fresh interpreter with `python -X importtime`, so
+# module caches from a previous phase never hide the real cold-start cost.
+# - ui: what the main thread imports before the window can be shown
+# - background: what BackgroundLoader imports off the UI thread
+# - chart: deferred Matplotlib chart (built right after the window is shown)
+PHASES = {
+    "ui": "import src.ui.main_window",
+    "background": "import cv2, torch, ultralytics, src.ui.ai_worker",
+    "chart": "import src.ui.realtime_chart",
+}
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int, int, int]]:
+    """
+    Parse `-X importtime` output into (module, self_us, cumulative_us, depth).
+    Depth 0 means the module was imported directly by the phase statement.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_part, cum_part, name = line.split(":", 1)[1].split("|", 2)
+            self_us, cum_us = int(self_part), int(cum_part)
+        except ValueError:
+            continue
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        rows.append((name.strip(), self_us, cum_us, depth))
+    return rows
+
+
+def profile_phase(statement: str) -> tuple[float, list[tuple[str, int, int, int]]]:
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - t0
+    if proc.returncode != 0:
+        raise RuntimeError(f"`{statement}` failed:\n{proc.stderr[-2000:]}")
+    return wall, parse_importtime(proc.stderr)
+
+
+def summarize(rows: list[tuple[str, int, int, int]], top: int) -> list[str]:
+    # Group by top-level package: a package's cost is the sum of the
+    # cumulative time of its outermost (shallowest) import entries.
+    by_package: dict[str, int] = {}
+    min_depth: dict[str, int] = {}
+    for name, _, cum_us, depth in rows:
+        pkg = name.split(".")[0]
+        if pkg not in min_depth or depth < min_depth[pkg]:
+            min_depth[pkg] = depth
+            by_package[pkg] = 0
+        if depth == min_depth[pkg]:
+            by_package[pkg] += cum_us
+
+    lines = [f"  {'package':<28}{'cumulative ms':>15}"]
+    for pkg, us in sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)[:top]:
+        lines.append(f"  {pkg:<28}{us / 1000:>15.1f}")
+
+    lines.append("")
+    lines.append(f"  {'slowest modules (self)':<48}{'self ms':>10}{'cum ms':>10}")
+    for name, self_us, cum_us, _ in sorted(rows, key=lambda r: r[1], reverse=True)[:top]:
+        lines.append(f"  {name[:46]:<48}{self_us / 1000:>10.1f}{cum_us / 1000:>10.1f}")
+    return lines
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Profile application cold start, broken down by import.")
+    p.add_argument("--phase", choices=sorted(PHASES), action="append",
+                   help="Phase(s) to profile (default: all)")
+    p.add_argument("--top", type=int, default=15, help="Rows per table")
+    p.add_argument("--out", default="output/startup_profile.txt", help="Report path")
+    args = p.parse_args()
+
+    report: list[str] = []
+    for phase in args.phase or list(PHASES):
+        wall, rows = profile_phase(PHASES[phase])
+        imports_ms = sum(r[2] for r in rows if r[3] == 0) / 1000
+        report.append(f"[{phase}] {PHASES[phase]}")
+        report.append(f"  interpreter wall: {wall * 1000:.0f} ms, imports: {imports_ms:.0f} ms")
+        report.extend(summarize(rows, args.top))
+        report.append("")
+
+    text = "\n".join(report)
+    print(text)
+    out = ROOT / args.out
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(text, encoding="utf-8")
+    print(f"Report -> {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
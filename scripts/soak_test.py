@@ -0,0 +1,239 @@
+from __future__ import annotations
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+# Soak test: runs the full AIWorker pipeline headless at maximum speed for a set
+# duration and samples process health at fixed intervals (RSS, open handles,
+# thread counts, tracemalloc top allocators, per-stage latency). Growth after
+# the warmup window is compared against thresholds; the exit code is 1 when any
+# threshold is exceeded so the script can gate a nightly job.
+#
+#   python scripts/soak_test.py --hours 8 --interval-sec 60
+#   python scripts/soak_test.py --hours 0.1 --interval-sec 10 --warmup-min 1   (quick check)
+
+
+def rss_mb() -> float:
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 2 ** 20
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource  # peak RSS only, but better than nothing
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def open_handles() -> int:
+    try:
+        import psutil
+        proc = psutil.Process()
+        return proc.num_handles() if os.name == "nt" else proc.num_fds()
+    except ImportError:
+        pass
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return -1
+
+
+def os_threads() -> int:
+    try:
+        import psutil
+        return psutil.Process().num_threads()
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("Threads:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return -1
+
+
+class Sampler(threading.Thread):
+    def __init__(self, worker, interval: float, warmup: float, top: int, use_tracemalloc: bool) -> None:
+        super().__init__(name="soak-sampler", daemon=True)
+        self.worker = worker
+        self.interval = interval
+        self.warmup = warmup
+        self.top = top
+        self.use_tracemalloc = use_tracemalloc
+        self.samples: list[dict] = []
+        self.baseline = None  # tracemalloc snapshot taken when warmup ends
+        self.stop_event = threading.Event()
+
+    def run(self) -> None:
+        t0 = time.time()
+        last_frames, last_t = 0, t0
+        while not self.stop_event.wait(self.interval):
+            now = time.time()
+            frames = self.worker.stage_timer.frames
+            sample = {
+                "t_sec": round(now - t0, 1),
+                "warm": now - t0 >= self.warmup,
+                "fps": round((frames - last_frames) / (now - last_t), 2),
+                "frames": frames,
+                "rss_mb": round(rss_mb(), 1),
+                "handles": open_handles(),
+                "py_threads": threading.active_count(),
+                "os_threads": os_threads(),
+                "stage_ms": self.worker.stage_timer.snapshot(),
+            }
+            last_frames, last_t = frames, now
+
+            if self.use_tracemalloc:
+                snap = tracemalloc.take_snapshot().filter_traces(
+                    [tracemalloc.Filter(False, tracemalloc.__file__)])
+                sample["traced_mb"] = round(tracemalloc.get_traced_memory()[0] / 2 ** 20, 2)
+                if sample["warm"] and self.baseline is None:
+                    self.baseline = snap
+                if self.baseline is not None:
+                    stats = snap.compare_to(self.baseline, "lineno")[:self.top]
+                    sample["top_growth"] = [
+                        {"where": str(s.traceback), "size_diff_kb": round(s.size_diff / 1024, 1),
+                         "count_diff": s.count_diff} for s in stats]
+            self.samples.append(sample)
+            print(f"[soak] t={sample['t_sec']:>7}s fps={sample['fps']:>6} rss={sample['rss_mb']}MB "
+                  f"handles={sample['handles']} threads={sample['os_threads']} stages={sample['stage_ms']}")
+
+
+def growth(samples: list[dict], key) -> float:
+    """Median of the last three warm samples minus the median of the first three."""
+    values = [key(s) for s in samples if s["warm"]]
+    if len(values) < 2:
+        return 0.0
+    n = min(3, len(values) // 2)
+    return statistics.median(values[-n:]) - statistics.median(values[:n])
+
+
+def evaluate(samples: list[dict], args) -> tuple[dict, list[str]]:
+    total_ms = lambda s: sum(s["stage_ms"].values())  # noqa: E731
+    warm = [s for s in samples if s["warm"] and s["stage_ms"]]
+    first = statistics.median(total_ms(s) for s in warm[:3]) if warm else 0.0
+    drift_pct = growth(warm, total_ms) / first * 100 if first else 0.0
+    result = {
+        "rss_growth_mb": round(growth(samples, lambda s: s["rss_mb"]), 1),
+        "handle_growth": growth(samples, lambda s: s["handles"]),
+        "thread_growth": growth(samples, lambda s: s["os_threads"]),
+        "latency_drift_pct": round(drift_pct, 1),
+    }
+    failures = []
+    if result["rss_growth_mb"] > args.max_rss_growth_mb:
+        failures.append(f"RSS grew {result['rss_growth_mb']} MB (> {args.max_rss_growth_mb})")
+    if result["handle_growth"] > args.max_handle_growth:
+        failures.append(f"open handles grew {result['handle_growth']} (> {args.max_handle_growth})")
+    if result["thread_growth"] > args.max_thread_growth:
+        failures.append(f"threads grew {result['thread_growth']} (> {args.max_thread_growth})")
+    if result["latency_drift_pct"] > args.max_latency_drift:
+        failures.append(f"per-frame latency drifted {result['latency_drift_pct']}% (> {args.max_latency_drift}%)")
+    return result, failures
+
+
+def resolve_arg(value: str, default: str | None) -> Path:
+    """Defaults are relative to the repo root; paths given on the command line to the caller's directory."""
+    return ROOT / value if value == default else Path(value).resolve()
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Run the worker pipeline at full speed and track resource growth.")
+    p.add_argument("--hours", type=float, default=1.0)
+    p.add_argument("--interval-sec", type=float, default=60.0, help="Sampling interval")
+    p.add_argument("--warmup-min", type=float, default=5.0, help="Samples before this are excluded from growth")
+    p.add_argument("--source", default="data/video_1.mp4", help="Video file or stream URL")
+    p.add_argument("--model", default="models/yolo11n-pose.pt")
+    p.add_argument("--imgsz", type=int, default=640,
+                   help="Model input size (explicit so runs are comparable across machines' runtime profiles)")
+    p.add_argument("--server", default=None, help="Use an inference server instead of a local model")
+    p.add_argument("--top", type=int, default=10, help="tracemalloc allocators per sample")
+    p.add_argument("--no-tracemalloc", action="store_true", help="Disable tracemalloc (lower overhead)")
+    p.add_argument("--max-rss-growth-mb", type=float, default=100.0)
+    p.add_argument("--max-handle-growth", type=float, default=20)
+    p.add_argument("--max-thread-growth", type=float, default=4)
+    p.add_argument("--max-latency-drift", type=float, default=25.0, help="Percent")
+    p.add_argument("--out", default="output/soak")
+    args = p.parse_args()
+
+    for name in ("model", "out"):
+        setattr(args, name, str(resolve_arg(getattr(args, name), p.get_default(name))))
+    if "://" not in args.source and not args.source.isdigit():  # stream URLs / camera indices stay as given
+        args.source = str(resolve_arg(args.source, p.get_default("source")))
+    from PySide6.QtCore import QCoreApplication
+    from src.ui.ai_worker import AIWorker
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])  # noqa: F841 (Qt objects need an app)
+    # Load the model before sampling starts so import/model-load memory is not counted as growth.
+    if args.server:
+        from src.inference_client import PoseClient
+        detector = PoseClient(args.server)
+    else:
+        import torch
+        from src.core_inference import PoseDetector
+        detector = PoseDetector(args.model, device="cuda" if torch.cuda.is_available() else "cpu",
+                                imgsz=args.imgsz)
+
+    if not args.no_tracemalloc:
+        tracemalloc.start(1)
+
+    worker = AIWorker(args.model, args.source, detector=detector)
+    worker.realtime = False  # no frame pacing: run as fast as the pipeline allows
+    worker.log_signal.connect(lambda text: print(f"[worker] {text}") if "❌" in text else None)
+
+    duration = args.hours * 3600
+    sampler = Sampler(worker, args.interval_sec, args.warmup_min * 60, args.top, not args.no_tracemalloc)
+    stopper = threading.Timer(duration, lambda: setattr(worker, "running", False))
+    started = datetime.now()
+    sampler.start()
+    stopper.start()
+    worker.run()  # blocks on this thread until the timer clears worker.running
+    sampler.stop_event.set()
+    sampler.join()
+    stopper.cancel()
+
+    result, failures = evaluate(sampler.samples, args)
+    report = {
+        "started": started.isoformat(timespec="seconds"),
+        "hours": args.hours,
+        "source": args.source,
+        "frames": worker.stage_timer.frames,
+        "result": result,
+        "thresholds": {"rss_growth_mb": args.max_rss_growth_mb, "handle_growth": args.max_handle_growth,
+                       "thread_growth": args.max_thread_growth, "latency_drift_pct": args.max_latency_drift},
+        "passed": not failures,
+        "failures": failures,
+        "samples": sampler.samples,
+    }
+    out = Path(args.out)
+    out.mkdir(parents=True, exist_ok=True)
+    path = out / f"soak_{started.strftime('%Y%m%d_%H%M%S')}.json"
+    path.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    print(json.dumps(result, indent=2))
+    if sampler.samples and sampler.samples[-1].get("top_growth"):
+        print("Top allocation growth since warmup:")
+        for item in sampler.samples[-1]["top_growth"][:5]:
+            print(f"  {item['size_diff_kb']:>10} KB  {item['where']}")
+    print(("PASS" if not failures else "FAIL: " + "; ".join(failures)) + f"  (report -> {path})")
+    return 0 if not failures else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,268 @@
+from __future__ import annotations
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.behavior import EventStateMachine, analyze_frame, roi_contours  # noqa: E402
+from src.core_inference import PoseDetector  # noqa: E402
+
+# Speed/accuracy sweep over model variants, input sizes, confidence thresholds and
+# inference backends. Every config runs the production event rules (src/behavior.py)
+# over the same clips; events are compared against a reference run (or hand labels)
+# and the results are reduced to a Pareto table plus a recommended config per
+# target frame rate for this hardware profile.
+#
+#   python scripts/sweep_models.py --models yolo11n-pose.pt yolo11s-pose.pt \
+#       --imgsz 320 480 640 --conf 0.25 0.5 --backends pt onnx --target-fps 10 15 25
+
+EVENT_TYPES = ("REACH", "BEND")
+
+
+def parse_config(spec: str) -> dict:
+    """'model:imgsz:conf:backend' -> dict"""
+    model, imgsz, conf, backend = spec.split(":")
+    return {"model": model, "imgsz": int(imgsz), "conf": float(conf), "backend": backend}
+
+
+def config_name(cfg: dict) -> str:
+    return f"{Path(cfg['model']).stem}@{cfg['imgsz']}/c{cfg['conf']}/{cfg['backend']}"
+
+
+def hardware_profile(device: str) -> str:
+    if device.startswith("cuda"):
+        import torch
+        return "gpu-" + torch.cuda.get_device_name(0).replace(" ", "_")
+    return f"cpu-{platform.machine()}-{os.cpu_count()}t"
+
+
+def resolve_weights(cfg: dict, models_dir: Path, cache: dict) -> str:
+    """Return the weights path for a config, exporting non-PyTorch backends once per (model, imgsz)."""
+    pt_path = models_dir / cfg["model"] if not os.path.isabs(cfg["model"]) else Path(cfg["model"])
+    if cfg["backend"] == "pt":
+        return str(pt_path)
+    key = (str(pt_path), cfg["imgsz"], cfg["backend"])
+    if key not in cache:
+        from ultralytics import YOLO
+        print(f"   exporting {pt_path.name} -> {cfg['backend']} (imgsz={cfg['imgsz']})")
+        cache[key] = YOLO(str(pt_path)).export(format=cfg["backend"], imgsz=cfg["imgsz"], verbose=False)
+    return str(cache[key])
+
+
+def run_config(cfg: dict, weights: str, clips: dict[str, str], roi: dict, device: str,
+               max_frames: int, warmup: int) -> dict:
+    """clips maps the clip name as given on the command line (event/label key) to its resolved path."""
+    detector = PoseDetector(weights, device=device, imgsz=cfg["imgsz"], conf=cfg["conf"])
+    latencies: list[float] = []
+    events: dict[str, dict[str, list[int]]] = {}
+
+    for clip, clip_path in clips.items():
+        cap = cv2.VideoCapture(clip_path)
+        machine = EventStateMachine()
+        clip_events = {t: [] for t in EVENT_TYPES}
+        cnt_left = cnt_right = None
+        idx = 0
+        while idx < max_frames:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            if cnt_left is None and cnt_right is None:
+                h, w = frame.shape[:2]
+                cnt_left, cnt_right = roi_contours(roi.get("left", []), roi.get("right", []), w, h)
+            if idx == 0:
+                for _ in range(warmup):
+                    detector.infer(frame)
+
+            t0 = time.perf_counter()
+            kpts, _ = detector.infer(frame)
+            latencies.append(time.perf_counter() - t0)
+
+            analysis = analyze_frame(kpts, cnt_left, cnt_right)
+            for ev in machine.update(analysis["trigger_left"] or analysis["trigger_right"], analysis["any_bend"]):
+                clip_events[ev].append(idx)
+            idx += 1
+        cap.release()
+        events[clip] = clip_events
+
+    lat = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        "config": cfg,
+        "name": config_name(cfg),
+        "frames": len(latencies),
+        "fps": round(len(latencies) / max(sum(latencies), 1e-9), 2),
+        "latency_ms_p50": round(float(np.percentile(lat, 50)), 2),
+        "latency_ms_p95": round(float(np.percentile(lat, 95)), 2),
+        "events": events,
+    }
+
+
+def match_events(ref: list[int], cand: list[int], tolerance: int) -> tuple[int, int, int]:
+    """Greedy one-to-one matching of event frame indices within +/- tolerance -> (tp, fp, fn)."""
+    used = [False] * len(cand)
+    tp = 0
+    for r in ref:
+        best, best_d = -1, tolerance + 1
+        for j, c in enumerate(cand):
+            d = abs(c - r)
+            if not used[j] and d <= tolerance and d < best_d:
+                best, best_d = j, d
+        if best >= 0:
+            used[best] = True
+            tp += 1
+    return tp, len(cand) - tp, len(ref) - tp
+
+
+def agreement(result: dict, reference: dict[str, dict[str, list[int]]], tolerance: int) -> dict:
+    per_type = {}
+    for ev in EVENT_TYPES:
+        tp = fp = fn = 0
+        for clip, ref_events in reference.items():
+            a, b, c = match_events(ref_events.get(ev, []), result["events"].get(clip, {}).get(ev, []), tolerance)
+            tp, fp, fn = tp + a, fp + b, fn + c
+        precision = tp / (tp + fp) if tp + fp else 1.0
+        recall = tp / (tp + fn) if tp + fn else 1.0
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+        per_type[ev] = {"tp": tp, "fp": fp, "fn": fn, "precision": round(precision, 3),
+                        "recall": round(recall, 3), "f1": round(f1, 3)}
+    return {"per_type": per_type, "f1": round(float(np.mean([v["f1"] for v in per_type.values()])), 3)}
+
+
+def pareto_front(results: list[dict]) -> set[str]:
+    front = set()
+    for r in results:
+        dominated = any(
+            o["fps"] >= r["fps"] and o["f1"] >= r["f1"] and (o["fps"] > r["fps"] or o["f1"] > r["f1"])
+            for o in results if o is not r)
+        if not dominated:
+            front.add(r["name"])
+    return front
+
+
+def recommend(results: list[dict], target_fps: list[float]) -> dict[str, str | None]:
+    recs = {}
+    for target in target_fps:
+        ok = [r for r in results if r["fps"] >= target]
+        best = max(ok, key=lambda r: (r["f1"], r["fps"])) if ok else None
+        recs[f">={target:g} fps"] = best["name"] if best else None
+    return recs
+
+
+def write_report(out_dir: Path, profile: str, results: list[dict], front: set[str],
+                 recs: dict, reference_name: str) -> Path:
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    out_dir.mkdir(parents=True, exist_ok=True)
+    base = out_dir / f"sweep_{profile}_{stamp}"
+
+    lines = [f"# Model sweep — {profile}", "", f"Reference: `{reference_name}`", "",
+             "| config | fps | p50 ms | p95 ms | reach F1 | bend F1 | F1 | pareto |",
+             "|---|---:|---:|---:|---:|---:|---:|:---:|"]
+    for r in sorted(results, key=lambda r: -r["fps"]):
+        pt = r["agreement"]["per_type"]
+        lines.append(f"| {r['name']} | {r['fps']} | {r['latency_ms_p50']} | {r['latency_ms_p95']} | "
+                     f"{pt['REACH']['f1']} | {pt['BEND']['f1']} | {r['f1']} | {'★' if r['name'] in front else ''} |")
+    lines += ["", "## Recommended", ""]
+    lines += [f"- {target}: `{name}`" if name else f"- {target}: (no config reaches this rate)"
+              for target, name in recs.items()]
+    base.with_suffix(".md").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    payload = {"profile": profile, "reference": reference_name, "recommended": recs,
+               "pareto": sorted(front), "results": results}
+    base.with_suffix(".json").write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8")
+    return base.with_suffix(".md")
+
+
+def resolve_arg(value: str, default: str | None) -> Path:
+    """Defaults are relative to the repo root; paths given on the command line to the caller's directory."""
+    return ROOT / value if value == default else Path(value).resolve()
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Sweep models / input sizes / thresholds / backends; report a speed-accuracy Pareto table.")
+    p.add_argument("--clips", nargs="+", default=["data/video_1.mp4"], help="Video clips to evaluate")
+    p.add_argument("--models", nargs="+", default=["yolo11n-pose.pt"], help="Weights under --models-dir")
+    p.add_argument("--models-dir", default="models")
+    p.add_argument("--imgsz", nargs="+", type=int, default=[320, 480, 640])
+    p.add_argument("--conf", nargs="+", type=float, default=[0.25, 0.5])
+    p.add_argument("--backends", nargs="+", default=["pt"], help="pt / onnx / openvino / engine ...")
+    p.add_argument("--reference", default=None,
+                   help="Reference config 'model:imgsz:conf:backend' (default: last model, largest imgsz, conf 0.5, pt)")
+    p.add_argument("--labels", default=None,
+                   help='Hand labels JSON {clip: {"REACH": [frame, ...], "BEND": [...]}} used instead of a reference run')
+    p.add_argument("--roi", default="data/roi_config.json")
+    p.add_argument("--device", default=None, help="cpu / cuda (default: auto)")
+    p.add_argument("--max-frames", type=int, default=300, help="Frames per clip")
+    p.add_argument("--warmup", type=int, default=5, help="Untimed warmup inferences per clip")
+    p.add_argument("--tolerance", type=int, default=5, help="Event match tolerance in frames")
+    p.add_argument("--target-fps", nargs="+", type=float, default=[10, 15, 25])
+    p.add_argument("--profile", default=None, help="Hardware profile name (default: auto-detected)")
+    p.add_argument("--out", default="output/sweep")
+    args = p.parse_args()
+
+    defaults = {name: p.get_default(name) for name in ("clips", "models_dir", "labels", "roi", "out")}
+    clips = {clip: str(resolve_arg(clip, clip if clip in defaults["clips"] else None)) for clip in args.clips}
+    for name in ("models_dir", "labels", "roi", "out"):
+        if getattr(args, name):
+            setattr(args, name, str(resolve_arg(getattr(args, name), defaults[name])))
+    device = args.device
+    if device is None:
+        import torch
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+    profile = args.profile or hardware_profile(device)
+    roi = json.loads(Path(args.roi).read_text(encoding="utf-8")) if Path(args.roi).exists() else {}
+    models_dir = Path(args.models_dir)
+    export_cache: dict = {}
+
+    grid = [{"model": m, "imgsz": s, "conf": c, "backend": b}
+            for m, s, c, b in itertools.product(args.models, args.imgsz, args.conf, args.backends)]
+
+    if args.labels:
+        labels = json.loads(Path(args.labels).read_text(encoding="utf-8"))
+        reference = {clip: labels.get(clip, {}) for clip in clips}
+        reference_name = f"labels:{args.labels}"
+    else:
+        ref_cfg = parse_config(args.reference) if args.reference else {
+            "model": args.models[-1], "imgsz": max(args.imgsz), "conf": 0.5, "backend": "pt"}
+        print(f"[reference] {config_name(ref_cfg)}")
+        ref_run = run_config(ref_cfg, resolve_weights(ref_cfg, models_dir, export_cache), clips, roi,
+                             device, args.max_frames, args.warmup)
+        reference = ref_run["events"]
+        reference_name = ref_run["name"]
+
+    results = []
+    for i, cfg in enumerate(grid, 1):
+        print(f"[{i}/{len(grid)}] {config_name(cfg)}")
+        try:
+            r = run_config(cfg, resolve_weights(cfg, models_dir, export_cache), clips, roi,
+                           device, args.max_frames, args.warmup)
+        except Exception as e:
+            print(f"   skipped: {e}")
+            continue
+        r["agreement"] = agreement(r, reference, args.tolerance)
+        r["f1"] = r["agreement"]["f1"]
+        print(f"   {r['fps']} fps, p95 {r['latency_ms_p95']} ms, F1 {r['f1']}")
+        results.append(r)
+
+    if not results:
+        print("No config completed.")
+        return 1
+    front = pareto_front(results)
+    recs = recommend(results, args.target_fps)
+    report = write_report(Path(args.out), profile, results, front, recs, reference_name)
+    print(report.read_text(encoding="utf-8"))
+    print(f"Report -> {report}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,98 @@
+"""
+行为判定规则 (伸手 / 弯腰)
+输入为 PoseDetector.infer 返回的 (N,17,3) 关键点，与绘制、Qt 无关，
+GUI 工作线程与离线评测脚本 (scripts/sweep_models.py) 共用同一套规则。
+"""
+import cv2
+import numpy as np
+
+from src.core_inference import PoseDetector
+
+KPT_CONF = 0.5  # 关键点置信度门限
+BEND_ANGLE = 140  # 肩-髋-膝夹角小于该值视为弯腰
+
+# COCO 关键点索引
+L_SHOULDER, R_SHOULDER = 5, 6
+L_ELBOW, R_ELBOW = 7, 8
+L_WRIST, R_WRIST = 9, 10
+R_HIP, R_KNEE = 12, 14
+
+
+def roi_contours(roi_left, roi_right, w, h):
+    """归一化 ROI 顶点 -> 像素坐标轮廓，点数不足 3 个的区域返回 None"""
+    cnt_left = None
+    cnt_right = None
+    if len(roi_left) >= 3:
+        cnt_left = np.array([(int(nx * w), int(ny * h)) for (nx, ny) in roi_left], np.int32)
+    if len(roi_right) >= 3:
+        cnt_right = np.array([(int(nx * w), int(ny * h)) for (nx, ny) in roi_right], np.int32)
+    return cnt_left, cnt_right
+
+
+def point_zone(pt, cnt_left, cnt_right):
+    """点所在的货架区域: "left" / "right" / None"""
+    if cnt_left is not None and cv2.pointPolygonTest(cnt_left, pt, False) > 0:
+        return "left"
+    if cnt_right is not None and cv2.pointPolygonTest(cnt_right, pt, False) > 0:
+        return "right"
+    return None
+
+
+def analyze_person(kps, cnt_left, cnt_right):
+    """
+    单人判定
+    返回 dict:
+      left_zone / right_zone: 左 / 右手腕伸入的货架区域 (None 表示未伸入)
+      bend_angle:             弯腰角度 (未弯腰或关键点不可信时为 None)
+    """
+    left_zone = None
+    right_zone = None
+    if kps[L_WRIST][2] > KPT_CONF:
+        left_zone = point_zone((int(kps[L_WRIST][0]), int(kps[L_WRIST][1])), cnt_left, cnt_right)
+    if kps[R_WRIST][2] > KPT_CONF:
+        right_zone = point_zone((int(kps[R_WRIST][0]), int(kps[R_WRIST][1])), cnt_left, cnt_right)
+
+    bend_angle = None
+    if kps[R_SHOULDER][2] > KPT_CONF and kps[R_HIP][2] > KPT_CONF and kps[R_KNEE][2] > KPT_CONF:
+        angle = PoseDetector.calculate_angle(kps[R_SHOULDER][:2], kps[R_HIP][:2], kps[R_KNEE][:2])
+        if angle < BEND_ANGLE:
+            bend_angle = angle
+    return {"left_zone": left_zone, "right_zone": right_zone, "bend_angle": bend_angle}
+
+
+def analyze_frame(all_kpts, cnt_left, cnt_right):
+    """
+    整帧判定
+    返回 dict:
+      persons:       每个人的 analyze_person 结果
+      trigger_left:  有人的左手腕伸入货架
+      trigger_right: 有人的右手腕伸入货架
+      any_bend:      画面中有人弯腰
+    """
+    persons = [analyze_person(kps, cnt_left, cnt_right) for kps in all_kpts]
+    return {
+        "persons": persons,
+        "trigger_left": any(p["left_zone"] is not None for p in persons),
+        "trigger_right": any(p["right_zone"] is not None for p in persons),
+        "any_bend": any(p["bend_angle"] is not None for p in persons),
+    }
+
+
+class EventStateMachine:
+    """
+    事件去抖：伸手 / 弯腰状态由无到有 (上升沿) 时计一次事件
+    """
+
+    def __init__(self):
+        self.state_memory = {"is_reaching": False, "is_bending": False}
+
+    def update(self, has_reach, has_bend):
+        """返回本帧新触发的事件类型列表 ("REACH" / "BEND")"""
+        events = []
+        if has_reach and not self.state_memory["is_reaching"]:
+            events.append("REACH")
+        if has_bend and not self.state_memory["is_bending"]:
+            events.append("BEND")
+        self.state_memory["is_reaching"] = bool(has_reach)
+        self.state_memory["is_bending"] = bool(has_bend)
+        return events
@@ -0,0 +1,173 @@
+"""
+两级级联推理
+第一级每帧以很小的输入尺寸跑一次姿态模型 (或单独指定的轻量模型)，只用来找人；
+只有检测框与货架区域 (roi_config.json 中的多边形，向外扩展 approach_margin 像素) 有交集的人，
+才把其所在区域裁成正方形图块，批量送入第二级全分辨率姿态推理。
+图块默认按原始像素推理 (不超过第二级模型的输入尺寸)，且任何情况下都不比第一级看到的分辨率更低。
+货架区域被栅格化为掩码并预先求积分图，每个框的相交判断只需 4 次查表。
+大量人员路过而很少伸手时，多数帧只需付出第一级的开销。
+对外接口与 PoseDetector.infer 一致，可直接交给 AIWorker 使用。
+"""
+import cv2
+import numpy as np
+
+from src.tiled_inference import merge_detections
+
+
+class ZoneMask:
+    """货架区域掩码 (下采样 scale 倍) 及其积分图"""
+
+    def __init__(self, contours, frame_shape, margin=40, scale=4):
+        h, w = frame_shape[:2]
+        self.scale = scale
+        mask = np.zeros((-(-h // scale), -(-w // scale)), np.uint8)
+        cv2.fillPoly(mask, [(c // scale).astype(np.int32) for c in contours], 1)
+        r = int(margin // scale)
+        if r > 0:
+            mask = cv2.dilate(mask, cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (2 * r + 1, 2 * r + 1)))
+        self.integral = cv2.integral(mask)  # (h+1, w+1) int32
+
+    def overlaps(self, boxes):
+        """boxes: (N,4+) 原图坐标 x1,y1,x2,y2 -> (N,) bool，框内是否有区域像素"""
+        if not len(boxes):
+            return np.zeros(0, bool)
+        ih, iw = self.integral.shape
+        xy = boxes[:, :4] / self.scale
+        x1 = np.clip(np.floor(xy[:, 0]).astype(int), 0, iw - 1)
+        y1 = np.clip(np.floor(xy[:, 1]).astype(int), 0, ih - 1)
+        x2 = np.clip(np.ceil(xy[:, 2]).astype(int), 0, iw - 1)
+        y2 = np.clip(np.ceil(xy[:, 3]).astype(int), 0, ih - 1)
+        s = self.integral
+        return (s[y2, x2] - s[y1, x2] - s[y2, x1] + s[y1, x1]) > 0
+
+
+class CascadePoseDetector:
+    NUM_KPTS = 17
+
+    STRIDE = 32
+
+    def __init__(self, detector, stage1=None, stage1_imgsz=320, crop_size=None, approach_margin=40, crop_pad=0.25,
+                 max_crops=8):
+        """
+        detector:        第二级 PoseDetector (需支持 infer_batch)
+        stage1:          第一级检测器，默认复用 detector 并以 stage1_imgsz 推理
+        crop_size:       第二级图块边长上限，默认为 detector.imgsz；小于上限的图块按原始尺寸推理，
+                         但不会缩小到低于第一级的分辨率 (图块边长按 32 对齐，同尺寸的图块合批推理)
+        approach_margin: 货架区域向外扩展的像素数，人靠近货架即进入第二级
+        crop_pad:        裁剪区域在检测框基础上外扩的比例 (第一级框在低分辨率下不够准)
+        max_crops:       单帧最多进入第二级的人数，超出时改为整帧全分辨率推理
+        """
+        self.detector = detector
+        self.stage1 = stage1
+        self.stage1_imgsz = stage1_imgsz
+        self.crop_size = crop_size
+        self.approach_margin = approach_margin
+        self.crop_pad = crop_pad
+        self.max_crops = max_crops
+        self.calculate_angle = detector.calculate_angle
+
+        self.zone_key = None
+        self.zones = None  # ZoneMask，未设置货架区域时为 None (只跑第一级)
+        self.crop_bufs = {}  # 图块边长 S -> (max_crops, S, S, 3) 预分配图块
+        self.counters = {"frames": 0, "stage2_frames": 0, "crops": 0, "full_frames": 0}
+
+    def set_zones(self, cnt_left, cnt_right, frame_shape):
+        """货架区域或分辨率变化时重建掩码"""
+        cnts = [c for c in (cnt_left, cnt_right) if c is not None]
+        key = (frame_shape[:2], tuple(c.tobytes() for c in cnts))
+        if key != self.zone_key:
+            self.zone_key = key
+            self.zones = ZoneMask(cnts, frame_shape, self.approach_margin) if cnts else None
+
+    def _stage1(self, frame):
+        if self.stage1 is not None:
+            k, b = self.stage1.infer(frame)
+        else:
+            k, b = self.detector.infer(frame, imgsz=self.stage1_imgsz)
+        return k.copy(), b.copy()  # 第二级会覆盖同一检测器的输出缓冲区
+
+    def _crop_regions(self, boxes, frame_shape):
+        """检测框 -> 原图内的正方形裁剪区域 (x, y, side)"""
+        h, w = frame_shape[:2]
+        regions = []
+        for x1, y1, x2, y2 in boxes[:, :4]:
+            side = min(max(max(x2 - x1, y2 - y1) * (1 + 2 * self.crop_pad), 32), h, w)
+            cx, cy = (x1 + x2) / 2, (y1 + y2) / 2
+            x = int(np.clip(cx - side / 2, 0, w - side))
+            y = int(np.clip(cy - side / 2, 0, h - side))
+            regions.append((x, y, int(side)))
+        return regions
+
+    def _crop_input_size(self, side, frame_shape):
+        """
+        裁剪区域边长 -> 第二级输入边长：原始尺寸，上限 crop_size (默认 detector.imgsz)，
+        下限为该区域在第一级输入中的尺寸，按 STRIDE 向上对齐
+        """
+        cap = self.crop_size or self.detector.imgsz
+        stage1_imgsz = self.stage1.imgsz if self.stage1 is not None else self.stage1_imgsz
+        floor = side * stage1_imgsz / max(frame_shape[:2])
+        s = max(min(side, cap), floor)
+        return int(-(-s // self.STRIDE) * self.STRIDE)
+
+    def infer(self, frame):
+        """返回整帧坐标的 (keypoints (N,17,3), boxes (N,5))"""
+        if frame is None:
+            return self.detector.infer(None)
+        self.counters["frames"] += 1
+        k1, b1 = self._stage1(frame)
+        if self.zones is None or not len(b1):
+            return k1, b1
+        near = self.zones.overlaps(b1)
+        if not near.any():
+            return k1, b1
+
+        self.counters["stage2_frames"] += 1
+        if near.sum() > self.max_crops:
+            # 货架前人太多，逐个裁剪不再划算
+            self.counters["full_frames"] += 1
+            k, b = self.detector.infer(frame)
+            return k.copy(), b.copy()
+
+        regions = self._crop_regions(b1[near], frame.shape)
+        # infer_batch 要求同一批分辨率一致：按输入边长分组，每组一次批量推理
+        groups = {}
+        for j, (x, y, side) in enumerate(regions):
+            groups.setdefault(self._crop_input_size(side, frame.shape), []).append(j)
+        results = [None] * len(regions)
+        for s, idx in groups.items():
+            buf = self.crop_bufs.get(s)
+            if buf is None:
+                buf = self.crop_bufs[s] = np.empty((self.max_crops, s, s, 3), np.uint8)
+            crops = []
+            for i, j in enumerate(idx):
+                x, y, side = regions[j]
+                interp = cv2.INTER_AREA if side > s else cv2.INTER_LINEAR
+                cv2.resize(frame[y:y + side, x:x + side], (s, s), dst=buf[i], interpolation=interp)
+                crops.append(buf[i])
+            for j, res in zip(idx, self.detector.infer_batch(crops, imgsz=s)):
+                results[j] = (s, res)
+        self.counters["crops"] += len(regions)
+
+        all_k, all_b = [k1[~near]], [b1[~near]]  # 远离货架的人保留第一级结果
+        k1_near, b1_near = k1[near], b1[near]
+        for j, ((x, y, side), (s, (k, b))) in enumerate(zip(regions, results)):
+            if not len(b):
+                # 第二级未检出时退回第一级结果，避免人数跳变
+                all_k.append(k1_near[j:j + 1])
+                all_b.append(b1_near[j:j + 1])
+            else:
+                scale = side / s
+                k = k.copy()
+                b = b.copy()
+                k[..., :2] = k[..., :2] * scale + (x, y)
+                b[:, 0:4:2] = b[:, 0:4:2] * scale + x
+                b[:, 1:4:2] = b[:, 1:4:2] * scale + y
+                all_k.append(k)
+                all_b.append(b)
+        # 相邻两人的图块互相包含对方，合并重复检出
+        return merge_detections(np.concatenate(all_k), np.concatenate(all_b))
+
+    def stats(self):
+        s = dict(self.counters)
+        s["stage2_ratio"] = round(s["stage2_frames"] / s["frames"], 3) if s["frames"] else 0.0
+        return s
@@ -3,7 +3,6 @@ import os
 import time
 import math
 import numpy as np
-from ultralytics import YOLO
 
 
 class PoseDetector:
@@ -12,14 +11,30 @@ class PoseDetector:
     包含：模型推理、几何计算
     """
 
-    def __init__(self, model_path, device='cpu'):
+    NUM_KPTS = 17  # COCO 关键点个数
+
+    def __init__(self, model_path, device='cpu', imgsz=None, conf=0.5, iou=0.7, max_det=100):
+        from src.runtime_profile import apply_thread_settings, load_runtime_profile
+
+        # 未指定输入尺寸时使用本机标定结果 (check_env.py --calibrate)，没有标定过则为 640
+        profile = load_runtime_profile()
+        self.model_path = model_path
         self.device = device
+        self.imgsz = imgsz or profile.get("imgsz", 640)
+        self.conf = conf
+        self.iou = iou
+        self.max_det = max_det
+        self._lean = None  # 精简推理通道的预分配缓冲区 (首次调用 infer 时创建)
         print(f"[Core] 正在加载模型: {model_path} (设备: {device})...")
 
         if not os.path.exists(model_path):
             raise FileNotFoundError(f"找不到模型文件: {model_path}")
 
         try:
+            # 延迟导入：ultralytics 会连带加载 torch，仅在真正创建模型时才付出这部分开销
+            from ultralytics import YOLO
+
+            apply_thread_settings(profile, opencv_threads=False)
             self.model = YOLO(model_path)
             # 预热
             self.model(data=None, verbose=False, device=self.device)
@@ -36,13 +51,186 @@ class PoseDetector:
             return None, None
 
         # 推理
-        results = self.model(frame, verbose=False, device=self.device, conf=0.5)
+        results = self.model(frame, verbose=False, device=self.device, conf=self.conf, imgsz=self.imgsz)
 
         # 获取绘图结果 (这是原图分辨率)
         annotated_frame = results[0].plot()
 
         return results[0], annotated_frame
 
+    # ------------------------------------------------------------------
+    # 精简推理通道：绕过 ultralytics 的 Results 对象
+    # letterbox -> 预分配输入张量 -> 网络前向 -> 置信度过滤 + NMS -> 预分配输出数组
+    # ------------------------------------------------------------------
+    def _prepare_lean(self):
+        import torch
+        import torchvision
+
+        if self.model.predictor is None:
+            # 借一次常规推理来构建 AutoBackend (完成设备迁移 / 融合 / 半精度设置)
+            self.model.predict(np.zeros((self.imgsz, self.imgsz, 3), np.uint8), verbose=False,
+                               device=self.device, imgsz=self.imgsz)
+        backend = self.model.predictor.model
+        # 新版 AutoBackend 以 format 字段标识后端，旧版为 pt / onnx ... 布尔属性
+        fmt = getattr(backend, "format", None)
+        is_pt = fmt == "pt" if fmt is not None else bool(getattr(backend, "pt", False))
+        if not is_pt and str(self.model_path).endswith(".pt"):
+            # .pt 权重被识别成固定尺寸后端会整帧补齐到正方形，比常规推理还慢，必须暴露出来
+            raise RuntimeError(f"无法识别 .pt 权重的后端类型 (format={fmt!r})，精简推理将退化为正方形输入")
+        self._lean = {
+            "torch": torch,
+            "nms": torchvision.ops.nms,
+            "backend": backend,
+            "stride": int(max(backend.stride)) if hasattr(backend.stride, "__iter__") else int(backend.stride),
+            "dtype": torch.float16 if backend.fp16 else torch.float32,
+            # 导出格式 (ONNX / OpenVINO / TensorRT 等) 的输入尺寸固定为 imgsz x imgsz，只有 PyTorch 权重支持 rect 输入
+            "square": not is_pt,
+            # (h, w, imgsz) -> 对应的缓冲区；分块 / 级联推理会交替使用几种分辨率，各自保留一份
+            "buffers": {},
+        }
+
+    MAX_LEAN_GEOMETRIES = 4
+
+    def _ensure_lean_buffers(self, frame_shape, batch, imgsz):
+        """
+        按 (分辨率, 输入尺寸, 批大小) 准备预分配缓冲区，仅在出现新组合或批大小超出容量时创建
+        画布只补齐到 stride 的整数倍 (与 ultralytics 的 rect 推理一致)，固定输入尺寸的导出格式补齐到正方形
+        返回该组合的缓冲区 dict
+        """
+        lean = self._lean
+        h, w = frame_shape[:2]
+        key = (h, w, imgsz)
+        buffers = lean["buffers"]
+        buf = buffers.get(key)
+        if buf is not None and batch <= buf["capacity"]:
+            return buf
+
+        torch, stride = lean["torch"], lean["stride"]
+        gain = min(imgsz / h, imgsz / w)
+        new_w, new_h = int(round(w * gain)), int(round(h * gain))
+        if lean["square"]:
+            in_w = in_h = imgsz
+        else:
+            in_w, in_h = -(-new_w // stride) * stride, -(-new_h // stride) * stride
+        pad_x, pad_y = (in_w - new_w) // 2, (in_h - new_h) // 2
+        capacity = max(batch, buf["capacity"] if buf else 0)
+
+        lb_buf = np.full((capacity, in_h, in_w, 3), 114, np.uint8)  # letterbox 画布 (BGR)
+        buf = {
+            "lb_buf": lb_buf,
+            "lb_tensor": torch.from_numpy(lb_buf),  # 与 lb_buf 共享内存
+            "input": torch.empty((capacity, 3, in_h, in_w), dtype=lean["dtype"], device=lean["backend"].device),
+            "kpts": np.zeros((capacity, self.max_det, self.NUM_KPTS, 3), np.float32),
+            "boxes": np.zeros((capacity, self.max_det, 5), np.float32),
+            "geometry": (gain, pad_x, pad_y, new_w, new_h),
+            "capacity": capacity,
+        }
+        buffers.pop(key, None)
+        if len(buffers) >= self.MAX_LEAN_GEOMETRIES:
+            buffers.pop(next(iter(buffers)))  # 淘汰最早创建的组合
+        buffers[key] = buf
+        return buf
+
+    def _decode(self, pred, frame_shape, geometry, kpts_out, boxes_out):
+        """
+        解码单张图的网络输出 pred: (4 + nc + 17*3, anchors)
+        geometry 为 letterbox 参数 (gain, pad_x, pad_y, new_w, new_h)
+        结果写入 kpts_out / boxes_out，返回人数
+        """
+        torch = self._lean["torch"]
+        gain, pad_x, pad_y = geometry[:3]
+        nk = self.NUM_KPTS * 3
+        nc = pred.shape[0] - 4 - nk
+        if nc < 1:
+            raise ValueError(f"不支持的姿态模型输出维度: {tuple(pred.shape)}")
+
+        scores = pred[4:4 + nc].amax(0)
+        mask = scores > self.conf
+        if not bool(mask.any()):
+            return 0
+        cand = pred[:, mask]
+        scores = scores[mask]
+
+        # xywh -> xyxy
+        xy, wh = cand[0:2], cand[2:4] / 2
+        boxes = torch.cat((xy - wh, xy + wh), 0).T
+        keep = self._lean["nms"](boxes.float(), scores.float(), self.iou)[:self.max_det]
+
+        # 一次性搬回 CPU，写入预分配数组
+        n = len(keep)
+        boxes_out[:n, :4] = boxes[keep].float().cpu().numpy()
+        boxes_out[:n, 4] = scores[keep].float().cpu().numpy()
+        kpts_out[:n] = cand[4 + nc:, keep].T.float().cpu().numpy().reshape(n, self.NUM_KPTS, 3)
+
+        # 映射回原图坐标
+        h, w = frame_shape[:2]
+        bx, by = boxes_out[:n, 0:4:2], boxes_out[:n, 1:4:2]  # 视图: (x1, x2) / (y1, y2)
+        bx -= pad_x
+        by -= pad_y
+        boxes_out[:n, :4] /= gain
+        np.clip(bx, 0, w, out=bx)
+        np.clip(by, 0, h, out=by)
+        k = kpts_out[:n]
+        k[..., 0] -= pad_x
+        k[..., 1] -= pad_y
+        k[..., :2] /= gain
+        # 与 ultralytics 的 scale_coords 一致，关键点也裁剪到画面内 (否则会出现负坐标流入区域判定 / 热力图)
+        np.clip(k[..., 0], 0, w - 1, out=k[..., 0])
+        np.clip(k[..., 1], 0, h - 1, out=k[..., 1])
+        return n
+
+    def infer_batch(self, frames, imgsz=None):
+        """
+        精简推理 (批量版)，frames 必须是同一分辨率
+        imgsz: 本次调用的模型输入尺寸 (默认 self.imgsz)；级联推理的粗筛阶段用较小的尺寸。
+               导出格式 (ONNX 等) 的输入尺寸在导出时已固定，只能使用导出时的尺寸
+        返回 [(keypoints, boxes), ...]，与 infer 的单帧返回格式一致
+        注意：返回值是内部预分配缓冲区的视图，下一次调用会被覆盖，需要保留请自行 copy()
+        """
+        if self._lean is None:
+            self._prepare_lean()
+        if not frames:
+            return []
+        shape = frames[0].shape
+        if any(f.shape != shape for f in frames):
+            raise ValueError("infer_batch 要求同一批次内的帧分辨率一致")
+
+        buf = self._ensure_lean_buffers(shape, len(frames), imgsz or self.imgsz)
+        _, pad_x, pad_y, new_w, new_h = buf["geometry"]
+        b = len(frames)
+        for i, frame in enumerate(frames):
+            cv2.resize(frame, (new_w, new_h), dst=buf["lb_buf"][i, pad_y:pad_y + new_h, pad_x:pad_x + new_w],
+                       interpolation=cv2.INTER_LINEAR)
+
+        # NHWC(BGR, uint8) -> NCHW(RGB, float)，直接写入预分配的输入张量
+        src, dst = buf["lb_tensor"][:b], buf["input"][:b]
+        for c in range(3):
+            dst[:, c].copy_(src[..., 2 - c], non_blocking=True)
+        dst.mul_(1 / 255.0)
+
+        outputs = []
+        with self._lean["torch"].inference_mode():
+            pred = self._lean["backend"](dst)
+            if isinstance(pred, (list, tuple)):
+                pred = pred[0]
+            for i in range(b):
+                n = self._decode(pred[i], shape, buf["geometry"], buf["kpts"][i], buf["boxes"][i])
+                outputs.append((buf["kpts"][i, :n], buf["boxes"][i, :n]))
+        return outputs
+
+    def infer(self, frame, imgsz=None):
+        """
+        精简推理 (不构建 Results 对象)
+        返回 (keypoints, boxes)，均为原图坐标：
+          keypoints: (N, 17, 3) float32 -> x, y, conf
+          boxes:     (N, 5) float32     -> x1, y1, x2, y2, conf
+        注意：返回值是内部预分配缓冲区的视图，下一次调用会被覆盖，需要保留请自行 copy()
+        """
+        if frame is None:
+            return (np.zeros((0, self.NUM_KPTS, 3), np.float32),
+                    np.zeros((0, 5), np.float32))
+        return self.infer_batch([frame], imgsz)[0]
+
     @staticmethod
     def calculate_angle(a, b, c):
         """
@@ -142,4 +330,7 @@ def debug_run():
 
 
 if __name__ == "__main__":
+    # 直接以脚本运行时，把项目根目录加入 sys.path，便于导入 src.*
+    import sys
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
     debug_run()
\ No newline at end of file
@@ -0,0 +1,169 @@
+"""
+证据截图存储
+- 按日期分目录: images/2026-10-19/REACH_093015_123.jpg，避免单目录下数万文件
+- 磁盘配额: 超出后按时间从旧到新淘汰
+- 近重复抑制: 与同类型上一张已保存截图的感知哈希 (dHash) 足够接近时不再落盘
+- 分级压缩: 只在最近一段时间内保留原图，更早的截图原地压缩为小尺寸缩略图
+索引只在启动时扫描一次目录，之后全部增量维护，不做周期性全量扫描。
+"""
+import os
+from collections import deque
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+
+def dhash(image, hash_size=8):
+    """64 位差值哈希：缩到 9x8 灰度图，比较水平相邻像素"""
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = small[:, 1:] > small[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+class EvidenceStore:
+    def __init__(self, root, quota_mb=2048.0, full_res_hours=24.0, thumb_width=480, thumb_quality=70,
+                 jpeg_quality=90, dedup_distance=6, dedup_window_sec=300.0, tier_interval_sec=600.0,
+                 tier_batch=50):
+        """
+        quota_mb:          证据目录磁盘配额 (MB)，0 表示不限制
+        full_res_hours:    原图保留时长，超过后压缩为缩略图，0 表示不压缩
+        dedup_distance:    dHash 汉明距离不超过该值视为近重复，-1 关闭去重
+        dedup_window_sec:  只与该时间窗内保存的上一张同类型截图比较
+        tier_interval_sec: 分级压缩的检查间隔
+        tier_batch:        每次最多压缩的文件数 (分摊到多次保存，避免单次卡顿)
+        """
+        self.root = root
+        self.quota_bytes = quota_mb * 1024 * 1024
+        self.full_res_sec = full_res_hours * 3600
+        self.thumb_width = thumb_width
+        self.thumb_quality = thumb_quality
+        self.jpeg_quality = jpeg_quality
+        self.dedup_distance = dedup_distance
+        self.dedup_window_sec = dedup_window_sec
+        self.tier_interval_sec = tier_interval_sec
+        self.tier_batch = tier_batch
+
+        self.entries = deque()  # [mtime, 绝对路径, 字节数, 是否已压缩]，按时间从旧到新
+        self.total_bytes = 0
+        self.tier_cursor = 0  # entries 中尚未检查过的第一个位置
+        self.last_tier_check = 0.0
+        self.last_saved = {}  # event_type -> (hash, 时间, 相对路径)
+        self.counters = {"saved": 0, "deduped": 0, "evicted": 0, "thumbnailed": 0}
+
+        os.makedirs(root, exist_ok=True)
+        self._scan()
+
+    def _scan(self):
+        """启动时建立索引 (唯一一次全量扫描)"""
+        found = []
+        for day in os.scandir(self.root):
+            if day.is_dir():
+                for f in os.scandir(day.path):
+                    if f.is_file() and f.name.lower().endswith(".jpg"):
+                        st = f.stat()
+                        found.append([st.st_mtime, f.path, st.st_size, False])
+            elif day.is_file() and day.name.lower().endswith(".jpg"):
+                # 旧版本平铺在根目录下的截图，同样纳入配额管理
+                st = day.stat()
+                found.append([st.st_mtime, day.path, st.st_size, False])
+        found.sort(key=lambda e: e[0])
+        self.entries.extend(found)
+        self.total_bytes = sum(e[2] for e in found)
+
+    # ------------------------------------------------------------------
+    def save(self, frame, event_type, now=None):
+        """
+        保存一张证据截图
+        返回 (相对路径, 是否为近重复)；近重复时不写新文件，返回上一张同类型截图的路径
+        """
+        now = now or datetime.now()
+        ts = now.timestamp()
+
+        h = None
+        if self.dedup_distance >= 0:
+            h = dhash(frame)
+            last = self.last_saved.get(event_type)
+            if last and ts - last[1] <= self.dedup_window_sec and hamming(h, last[0]) <= self.dedup_distance:
+                self.counters["deduped"] += 1
+                return last[2], True
+
+        rel = os.path.join(now.strftime("%Y-%m-%d"), f"{event_type}_{now.strftime('%H%M%S_%f')[:-3]}.jpg")
+        path = os.path.join(self.root, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        cv2.imwrite(path, frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        size = os.path.getsize(path)
+
+        self.entries.append([ts, path, size, False])
+        self.total_bytes += size
+        self.counters["saved"] += 1
+        if h is not None:
+            self.last_saved[event_type] = (h, ts, rel)
+
+        self._tier(ts)
+        self._enforce_quota()
+        return rel, False
+
+    def _enforce_quota(self):
+        if not self.quota_bytes:
+            return
+        while self.total_bytes > self.quota_bytes and len(self.entries) > 1:
+            _, path, size, _ = self.entries.popleft()
+            self.tier_cursor = max(0, self.tier_cursor - 1)
+            self.total_bytes -= size
+            try:
+                os.remove(path)
+                self.counters["evicted"] += 1
+            except OSError:
+                pass
+            # 被淘汰的截图不能再作为近重复的复用目标 (否则 CSV 会指向已删除的文件)
+            for event_type, (_, _, rel) in list(self.last_saved.items()):
+                if os.path.join(self.root, rel) == path:
+                    del self.last_saved[event_type]
+            day_dir = os.path.dirname(path)
+            if day_dir != self.root:
+                try:
+                    os.rmdir(day_dir)  # 仅在目录已空时成功
+                except OSError:
+                    pass
+
+    def _tier(self, now_ts):
+        """把超过原图保留期的截图原地压缩为缩略图 (按时间顺序推进游标，每次最多 tier_batch 张)"""
+        if not self.full_res_sec or now_ts - self.last_tier_check < self.tier_interval_sec:
+            return
+        self.last_tier_check = now_ts
+        cutoff = now_ts - self.full_res_sec
+        done = 0
+        while self.tier_cursor < len(self.entries) and done < self.tier_batch:
+            entry = self.entries[self.tier_cursor]
+            if entry[0] > cutoff:
+                break
+            self.tier_cursor += 1
+            if entry[3]:
+                continue
+            entry[3] = True
+            img = cv2.imread(entry[1])
+            if img is None or img.shape[1] <= self.thumb_width:
+                continue  # 已是缩略图 (例如上次运行时压缩过)
+            th = int(round(img.shape[0] * self.thumb_width / img.shape[1]))
+            thumb = cv2.resize(img, (self.thumb_width, th), interpolation=cv2.INTER_AREA)
+            cv2.imwrite(entry[1], thumb, [cv2.IMWRITE_JPEG_QUALITY, self.thumb_quality])
+            os.utime(entry[1], (entry[0], entry[0]))  # 保留原始时间，重启后淘汰顺序不变
+            new_size = os.path.getsize(entry[1])
+            self.total_bytes += new_size - entry[2]
+            entry[2] = new_size
+            self.counters["thumbnailed"] += 1
+            done += 1
+        if done == self.tier_batch:
+            self.last_tier_check = 0.0  # 还有积压，下次保存时继续
+
+    def stats(self):
+        s = dict(self.counters)
+        s["files"] = len(self.entries)
+        s["used_mb"] = round(self.total_bytes / 1024 / 1024, 1)
+        return s
@@ -0,0 +1,94 @@
+"""
+工作线程的帧缓冲池
+按当前源分辨率预分配解码缓冲、绘制画布与一组显示用 QImage，循环复用，分辨率变化时才重建：
+  - 解码: cap.read(pool.decode) 直接解码进池内缓冲
+  - 画布: np.copyto(pool.canvas, frame) 代替 frame.copy()
+  - 显示: BGR->RGB 用 cvtColor(dst=) 直接写进 QImage 自己的像素内存，不再 .copy()
+显示图像轮流使用 ring 个 QImage。界面还没处理完上一轮的同一张图时 (排队中的信号持有其浅拷贝)，
+bits() 会触发 Qt 的写时复制，保证不会改写界面正在用的像素；这种情况计为一次未命中。
+命中 / 未命中按缓冲区类别 (decode / canvas / display) 分别计数，只有确实复用了已有缓冲区才算命中。
+"""
+import numpy as np
+from PySide6.QtGui import QImage
+
+
+def _address(buffer):
+    return np.frombuffer(buffer, np.uint8).__array_interface__["data"][0]
+
+
+class FramePool:
+    KINDS = ("decode", "canvas", "display")
+
+    def __init__(self, ring=3):
+        self.ring = ring
+        self.shape = None
+        self.decode = None
+        self.canvas = None
+        self.rgb = None  # 仅当 QImage 行有对齐填充时作为中转
+        self.images = []
+        self.next_index = 0
+        self.counters = {kind: {"hits": 0, "misses": 0} for kind in self.KINDS}
+        self.rebuilds = 0
+
+    def ensure(self, shape):
+        """按分辨率 (h, w, 3) 准备缓冲区，分辨率不变时什么都不做"""
+        if shape == self.shape:
+            return
+        h, w = shape[:2]
+        self.shape = shape
+        self.decode = np.empty(shape, np.uint8)
+        self.canvas = np.empty(shape, np.uint8)
+        self.images = [QImage(w, h, QImage.Format_RGB888) for _ in range(self.ring)]
+        self.rgb = np.empty(shape, np.uint8) if self.images[0].bytesPerLine() != w * 3 else None
+        self.next_index = 0
+        self.rebuilds += 1
+
+    def _count(self, kind, hit):
+        self.counters[kind]["hits" if hit else "misses"] += 1
+
+    def adopt_decoded(self, frame):
+        """
+        cap.read(pool.decode) 之后调用：确认解码确实写进了池内缓冲
+        (首帧或分辨率变化时 OpenCV 会另行分配，此时按新分辨率重建)
+        """
+        if frame.shape != self.shape:
+            self.ensure(frame.shape)
+            self._count("decode", False)
+        else:
+            self._count("decode", frame.ctypes.data == self.decode.ctypes.data)
+        return frame
+
+    def canvas_from(self, frame):
+        """把帧拷进池内画布并返回画布"""
+        reused = frame.shape == self.shape
+        self.ensure(frame.shape)
+        self._count("canvas", reused)
+        np.copyto(self.canvas, frame)
+        return self.canvas
+
+    def next_image(self, rgb_writer):
+        """
+        取下一张显示用 QImage，rgb_writer(dst) 负责把 RGB 像素写入 dst (h, w, 3)
+        返回写好的 QImage
+        """
+        img = self.images[self.next_index]
+        self.next_index = (self.next_index + 1) % self.ring
+        h, w = self.shape[:2]
+        before = _address(img.constBits())
+        bits = img.bits()  # 若仍被界面持有，此处发生写时复制
+        self._count("display", _address(bits) == before)
+        view = np.ndarray((h, w, 3), np.uint8, buffer=bits, strides=(img.bytesPerLine(), 3, 1))
+        if self.rgb is None:
+            rgb_writer(view)
+        else:
+            rgb_writer(self.rgb)
+            np.copyto(view, self.rgb)
+        return img
+
+    def stats(self):
+        """{类别: {hits, misses, hit_rate}, rebuilds}"""
+        s = {"rebuilds": self.rebuilds}
+        for kind, c in self.counters.items():
+            total = c["hits"] + c["misses"]
+            s[kind] = dict(c, hit_rate=round(c["hits"] / total, 3) if total else 1.0)
+        return s
@@ -0,0 +1,201 @@
+"""
+货架交互热力图
+把每一帧中置信度足够的手腕位置累加到低分辨率网格 (每个格子 cell×cell 像素)，
+按 区域 (未伸入 / 左货架 / 右货架) × 事件 (手腕出现 / 弯腰时的手腕) 分层计数。
+每个关键点只做一次下标计算与一次累加，整帧一次 np.add.at 完成。
+网格按小时、按班次滚动：跨过边界时导出上一时段并清零；当前班次定期导出一次快照。
+同一时段内重启监控时，先读回磁盘上该时段已导出的计数再继续累加，不会覆盖重启前的数据。
+导出为 output/heatmaps/<日期>/ 下的 .npz 计数数组与叠加在画面上的 PNG。
+"""
+import os
+from datetime import datetime, timedelta
+
+import cv2
+import numpy as np
+
+from src.behavior import KPT_CONF, L_WRIST, R_WRIST
+
+ZONES = ("none", "left", "right")
+EVENTS = ("wrist", "bend")
+_ZONE_INDEX = {None: 0, "left": 1, "right": 2}
+
+
+def current_shift_start(now, shift_hours=8.0, first_shift_hour=6):
+    """
+    now 所在班次的开始时间
+    班次从每天 first_shift_hour 点起每 shift_hours 小时一班 (24 应能被 shift_hours 整除)
+    """
+    base = now.replace(hour=first_shift_hour, minute=0, second=0, microsecond=0)
+    if now < base:
+        base -= timedelta(days=1)
+    n = int((now - base).total_seconds() // (shift_hours * 3600))
+    return base + timedelta(hours=n * shift_hours)
+
+
+class InteractionHeatmap:
+    def __init__(self, out_dir, cell=16, shift_hours=8.0, first_shift_hour=6, export_interval_sec=300.0,
+                 overlay_refresh_sec=1.0, overlay_alpha=0.6, png_width=960):
+        """
+        cell:                网格边长 (像素)，1080p + 16 像素约为 120×68 个格子
+        export_interval_sec: 当前班次快照的导出间隔，0 表示只在滚动 / 停止时导出
+        overlay_refresh_sec: 画面叠加层的重算间隔，其余帧复用缓存
+        png_width:           导出 PNG 的宽度 (高度按比例)
+        """
+        self.out_dir = out_dir
+        self.cell = cell
+        self.shift_hours = shift_hours
+        self.first_shift_hour = first_shift_hour
+        self.export_interval_sec = export_interval_sec
+        self.overlay_refresh_sec = overlay_refresh_sec
+        self.overlay_alpha = overlay_alpha
+        self.png_width = png_width
+
+        self.frame_size = None  # (w, h)，首帧确定；分辨率变化时重建网格
+        self.hour_grid = None
+        self.shift_grid = None
+        self.hour_start = None
+        self.shift_start = None
+        self.bases = {}  # "hour" / "shift" -> 当前时段的导出路径 (不含扩展名)
+        self.background = None  # 最近一帧的缩小版，导出 PNG 时作底图
+        self.last_export = 0.0
+        self.overlay = None  # 缓存的彩色叠加层 (已乘以强度，零计数处为黑)
+        self.overlay_ts = 0.0
+        self.counters = {"samples": 0, "exports": 0}
+
+    def _reset(self, w, h, now):
+        gw, gh = -(-w // self.cell), -(-h // self.cell)
+        self.frame_size = (w, h)
+        self.hour_grid = np.zeros((len(ZONES), len(EVENTS), gh, gw), np.float32)
+        self.shift_grid = np.zeros_like(self.hour_grid)
+        self.hour_start = now.replace(minute=0, second=0, microsecond=0)
+        self.shift_start = current_shift_start(now, self.shift_hours, self.first_shift_hour)
+        self._begin_period("hour", self.hour_grid, self.hour_start)
+        self._begin_period("shift", self.shift_grid, self.shift_start)
+        self.overlay = None
+
+    def _begin_period(self, kind, grid, start):
+        """
+        新时段开始：清零网格，若该时段已有导出 (本时段内重启过) 则读回计数继续累加
+        已有文件的网格尺寸 / 分辨率与当前不一致时无法合并，改写到 _2、_3 ... 后缀的新文件
+        """
+        grid[:] = 0
+        day_dir = os.path.join(self.out_dir, start.strftime("%Y-%m-%d"))
+        stem = f"{kind}_{start.strftime('%H%M')}"
+        n = 1
+        while True:
+            base = os.path.join(day_dir, stem if n == 1 else f"{stem}_{n}")
+            if not os.path.exists(base + ".npz"):
+                break
+            try:
+                with np.load(base + ".npz") as old:
+                    counts = old["counts"]
+                    compatible = (int(old["cell"]) == self.cell and counts.shape == grid.shape
+                                  and tuple(old["frame_size"]) == self.frame_size)
+            except (OSError, ValueError, KeyError):
+                compatible = False
+            if compatible:
+                grid += counts
+                break
+            n += 1
+        self.bases[kind] = base
+
+    def update(self, frame, all_kpts, persons, now=None):
+        """
+        累加一帧
+        all_kpts: (N,17,3) 关键点；persons: analyze_frame 的逐人结果 (复用已算好的区域，不再做点-多边形测试)
+        """
+        now = now or datetime.now()
+        h, w = frame.shape[:2]
+        if self.frame_size != (w, h):
+            if self.frame_size is not None:
+                self.export()
+            self._reset(w, h, now)
+        self._rollover(frame, now)
+
+        n = len(persons)
+        if n:
+            wrists = np.asarray(all_kpts)[:, (L_WRIST, R_WRIST)]  # (N,2,3)
+            zone = np.array([(_ZONE_INDEX[p["left_zone"]], _ZONE_INDEX[p["right_zone"]]) for p in persons])
+            event = np.repeat(np.array([p["bend_angle"] is not None for p in persons], np.intp)[:, None], 2, 1)
+            ok = wrists[..., 2] > KPT_CONF
+            if ok.any():
+                gx = np.clip((wrists[..., 0][ok] // self.cell).astype(np.intp), 0, self.hour_grid.shape[3] - 1)
+                gy = np.clip((wrists[..., 1][ok] // self.cell).astype(np.intp), 0, self.hour_grid.shape[2] - 1)
+                idx = (zone[ok], event[ok], gy, gx)
+                np.add.at(self.hour_grid, idx, 1)
+                np.add.at(self.shift_grid, idx, 1)
+                self.counters["samples"] += int(ok.sum())
+
+        ts = now.timestamp()
+        if self.export_interval_sec and ts - self.last_export >= self.export_interval_sec:
+            if self.last_export:
+                self._keep_background(frame)
+                self._write("shift", self.shift_grid, self.shift_start)
+            self.last_export = ts
+
+    def _rollover(self, frame, now):
+        if now - self.hour_start >= timedelta(hours=1):
+            self._keep_background(frame)
+            self._write("hour", self.hour_grid, self.hour_start)
+            self.hour_start = now.replace(minute=0, second=0, microsecond=0)
+            self._begin_period("hour", self.hour_grid, self.hour_start)
+        shift_start = current_shift_start(now, self.shift_hours, self.first_shift_hour)
+        if shift_start != self.shift_start:
+            self._keep_background(frame)
+            self._write("shift", self.shift_grid, self.shift_start)
+            self.shift_start = shift_start
+            self._begin_period("shift", self.shift_grid, self.shift_start)
+            self.overlay = None
+
+    # ------------------------------------------------------------------
+    def _keep_background(self, frame):
+        h, w = frame.shape[:2]
+        ph = int(round(h * self.png_width / w))
+        self.background = cv2.resize(frame, (self.png_width, ph), interpolation=cv2.INTER_AREA)
+
+    def _colorize(self, grid, size):
+        """计数网格 -> 指定尺寸的彩色热力层 (零计数处为黑，便于直接相加叠加)"""
+        heat = grid.sum(axis=(0, 1))
+        peak = heat.max()
+        if peak <= 0:
+            return np.zeros((size[1], size[0], 3), np.uint8)
+        norm = np.sqrt(heat / peak)  # 开方拉开低计数区域的层次
+        color = cv2.applyColorMap((norm * 255).astype(np.uint8), cv2.COLORMAP_JET)
+        color = (color * norm[..., None]).astype(np.uint8)
+        return cv2.resize(color, size, interpolation=cv2.INTER_LINEAR)
+
+    def _write(self, kind, grid, start):
+        if grid is None or not grid.any():
+            return
+        base = self.bases[kind]
+        os.makedirs(os.path.dirname(base), exist_ok=True)
+        np.savez_compressed(base + ".npz", counts=grid, zones=np.array(ZONES), events=np.array(EVENTS),
+                            cell=self.cell, frame_size=np.array(self.frame_size), start=start.isoformat())
+        if self.background is not None:
+            bh, bw = self.background.shape[:2]
+            png = cv2.addWeighted(self.background, 1.0, self._colorize(grid, (bw, bh)), self.overlay_alpha, 0)
+            cv2.imwrite(base + ".png", png)
+        self.counters["exports"] += 1
+
+    def export(self, frame=None):
+        """立即导出当前小时与当前班次 (停止监控时调用)"""
+        if self.frame_size is None:
+            return
+        if frame is not None:
+            self._keep_background(frame)
+        self._write("hour", self.hour_grid, self.hour_start)
+        self._write("shift", self.shift_grid, self.shift_start)
+
+    def render(self, canvas, now_ts):
+        """把当前班次的热力层加亮叠加到画面上 (原地修改)"""
+        if self.shift_grid is None:
+            return
+        if self.overlay is None or now_ts - self.overlay_ts >= self.overlay_refresh_sec:
+            self.overlay = self._colorize(self.shift_grid, self.frame_size)
+            self.overlay_ts = now_ts
+        cv2.addWeighted(canvas, 1.0, self.overlay, self.overlay_alpha, 0, dst=canvas)
+
+    def stats(self):
+        s = dict(self.counters)
+        s["shift_start"] = self.shift_start.strftime("%H:%M") if self.shift_start else None
+        return s
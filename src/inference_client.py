@@ -0,0 +1,96 @@
+import http.client
+import json
+import socket
+from urllib.parse import urlparse
+
+import cv2
+import numpy as np
+
+from src.core_inference import PoseDetector
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout=10.0):
+        super().__init__("localhost", timeout=timeout)
+        self.unix_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_path)
+
+
+class ServiceError(ConnectionError):
+    """推理服务返回非 200 响应"""
+
+
+class PoseClient:
+    """
+    推理服务的瘦客户端 (见 src/inference_server.py)
+    提供与 PoseDetector 相同的 infer / calculate_angle 接口，可直接交给 AIWorker 使用；
+    本进程不加载 torch / ultralytics。
+    url 示例: http://127.0.0.1:8765 或 unix:///tmp/pose.sock
+    """
+
+    NUM_KPTS = PoseDetector.NUM_KPTS
+    calculate_angle = staticmethod(PoseDetector.calculate_angle)
+
+    def __init__(self, url, jpeg_quality=None, timeout=10.0):
+        self.url = url
+        self.jpeg_quality = jpeg_quality  # None: 发送原始像素 (本机最快)；设置后改为 JPEG 压缩传输
+        self.timeout = timeout
+        self.conn = None
+
+    def _connect(self):
+        u = urlparse(self.url)
+        if u.scheme == "unix":
+            return _UnixHTTPConnection(u.path, timeout=self.timeout)
+        return http.client.HTTPConnection(u.hostname or "127.0.0.1", u.port or 8765, timeout=self.timeout)
+
+    def _request(self, method, path, body=None, headers=None):
+        # 复用 keep-alive 连接，连接断开时重连一次
+        for attempt in range(2):
+            if self.conn is None:
+                self.conn = self._connect()
+            try:
+                self.conn.request(method, path, body=body, headers=headers or {})
+                resp = self.conn.getresponse()
+                return resp, resp.read()
+            except (ConnectionError, http.client.HTTPException, OSError):
+                self.close()
+                if attempt:
+                    raise
+
+    def health(self):
+        resp, data = self._request("GET", "/health")
+        if resp.status != 200:
+            raise ServiceError(f"推理服务异常: HTTP {resp.status}")
+        return json.loads(data)
+
+    def infer(self, frame):
+        """返回 (keypoints (N,17,3), boxes (N,5))，格式与 PoseDetector.infer 一致"""
+        if frame is None:
+            return np.zeros((0, self.NUM_KPTS, 3), np.float32), np.zeros((0, 5), np.float32)
+
+        if self.jpeg_quality:
+            ok, buf = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, int(self.jpeg_quality)])
+            body, headers = buf.tobytes(), {"Content-Type": "image/jpeg"}
+        else:
+            h, w = frame.shape[:2]
+            body = np.ascontiguousarray(frame).data
+            headers = {"Content-Type": "application/octet-stream", "X-Width": str(w), "X-Height": str(h)}
+
+        resp, data = self._request("POST", "/infer", body=body, headers=headers)
+        if resp.status != 200:
+            raise ServiceError(f"推理服务返回错误 ({resp.status}): {data[:200].decode('utf-8', 'replace')}")
+
+        n = int(resp.getheader("X-Count", 0))
+        arr = np.frombuffer(data, np.float32)
+        boxes = arr[:n * 5].reshape(n, 5)
+        kpts = arr[n * 5:].reshape(n, self.NUM_KPTS, 3)
+        return kpts, boxes
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
@@ -0,0 +1,256 @@
+"""
+本地推理服务
+一个常驻进程持有一份预热好的 PoseDetector，GUI / debug_run / 临时脚本通过 HTTP 或 Unix socket 共享，
+并发请求按 (批大小上限, 等待时延预算) 动态合批后一次送入模型。
+
+协议 (POST /infer)：
+  - Content-Type: image/jpeg                 -> 请求体为 JPEG
+  - Content-Type: application/octet-stream   -> 请求体为 BGR uint8 原始像素，需带 X-Width / X-Height
+  响应：application/octet-stream，X-Count = 人数 N，
+        响应体依次为 boxes (N,5) float32 与 keypoints (N,17,3) float32 的原始字节
+GET /health 返回 JSON 统计信息
+
+用法：
+  python -m src.inference_server --model models/yolo11n-pose.pt --port 8765
+  python -m src.inference_server --model models/yolo11n-pose.pt --unix /tmp/pose.sock
+"""
+import argparse
+import json
+import os
+import queue
+import socketserver
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+import numpy as np
+
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core_inference import PoseDetector
+from src.runtime_profile import load_runtime_profile, resolve_model
+
+
+class _Request:
+    """一次待推理的请求 (由 HTTP 线程创建，批处理线程填充结果)"""
+    __slots__ = ("frame", "done", "kpts", "boxes", "error")
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.done = threading.Event()
+        self.kpts = None
+        self.boxes = None
+        self.error = None
+
+
+class DynamicBatcher:
+    """
+    动态合批器
+    唯一的推理线程从队列中取请求：拿到第一条后最多再等 max_wait_ms，
+    期间凑满 batch_size 就立即出发；同一批次内按分辨率分组调用 infer_batch。
+    """
+
+    def __init__(self, detector, batch_size=8, max_wait_ms=10.0):
+        self.detector = detector
+        self.batch_size = max(1, int(batch_size))
+        self.max_wait = max_wait_ms / 1000.0
+        self.queue = queue.Queue()
+        self.running = True
+        self.stats = {"batches": 0, "frames": 0, "infer_sec": 0.0}
+        self.thread = threading.Thread(target=self._loop, name="pose-batcher", daemon=True)
+        self.thread.start()
+
+    def submit(self, frame, timeout=10.0):
+        req = _Request(frame)
+        self.queue.put(req)
+        if not req.done.wait(timeout):
+            raise TimeoutError("推理超时")
+        if req.error is not None:
+            raise req.error
+        return req.kpts, req.boxes
+
+    def _collect(self):
+        try:
+            first = self.queue.get(timeout=0.5)
+        except queue.Empty:
+            return []
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self):
+        while self.running:
+            batch = self._collect()
+            if not batch:
+                continue
+
+            groups = {}
+            for req in batch:
+                groups.setdefault(req.frame.shape, []).append(req)
+
+            t0 = time.perf_counter()
+            for reqs in groups.values():
+                try:
+                    outputs = self.detector.infer_batch([r.frame for r in reqs])
+                    for req, (kpts, boxes) in zip(reqs, outputs):
+                        # infer_batch 返回的是复用缓冲区的视图，交给其他线程前必须拷贝
+                        req.kpts, req.boxes = kpts.copy(), boxes.copy()
+                except Exception as e:
+                    for req in reqs:
+                        req.error = e
+                for req in reqs:
+                    req.frame = None
+                    req.done.set()
+
+            self.stats["infer_sec"] += time.perf_counter() - t0
+            self.stats["frames"] += len(batch)
+            self.stats["batches"] += 1
+
+    def snapshot(self):
+        s = dict(self.stats)
+        s["queue_depth"] = self.queue.qsize()
+        s["avg_batch"] = round(s["frames"] / s["batches"], 2) if s["batches"] else 0.0
+        s["batch_size"] = self.batch_size
+        s["max_wait_ms"] = self.max_wait * 1000
+        return s
+
+    def stop(self):
+        self.running = False
+        self.thread.join(timeout=2)
+
+
+def decode_frame(content_type, headers, body):
+    """把请求体还原为 BGR uint8 图像"""
+    if content_type.startswith("image/"):
+        frame = cv2.imdecode(np.frombuffer(body, np.uint8), cv2.IMREAD_COLOR)
+        if frame is None:
+            raise ValueError("JPEG 解码失败")
+        return frame
+    w, h = int(headers.get("X-Width", 0)), int(headers.get("X-Height", 0))
+    if w <= 0 or h <= 0 or len(body) != w * h * 3:
+        raise ValueError("原始帧需要正确的 X-Width / X-Height (BGR uint8)")
+    return np.frombuffer(body, np.uint8).reshape(h, w, 3)
+
+
+def encode_result(kpts, boxes):
+    return np.ascontiguousarray(boxes, np.float32).tobytes() + np.ascontiguousarray(kpts, np.float32).tobytes()
+
+
+class InferenceHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # 支持 keep-alive，客户端可复用连接
+    batcher = None  # 由 make_server 注入
+
+    def _reply(self, code, body, content_type="application/octet-stream", headers=None):
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, str(v))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._reply(200, json.dumps(self.batcher.snapshot()).encode("utf-8"), "application/json")
+        else:
+            self._reply(404, b"not found", "text/plain")
+
+    def do_POST(self):
+        if self.path != "/infer":
+            self._reply(404, b"not found", "text/plain")
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = self.rfile.read(length)
+            frame = decode_frame(self.headers.get("Content-Type", ""), self.headers, body)
+            kpts, boxes = self.batcher.submit(frame)
+        except ValueError as e:
+            self._reply(400, str(e).encode("utf-8"), "text/plain")
+            return
+        except Exception as e:
+            self._reply(500, str(e).encode("utf-8"), "text/plain")
+            return
+        self._reply(200, encode_result(kpts, boxes), headers={"X-Count": len(boxes)})
+
+    def address_string(self):
+        # Unix socket 下 client_address 为空字符串
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, fmt, *args):
+        pass  # 每帧一条访问日志过于嘈杂
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+        super().server_bind()
+        self.server_name, self.server_port = "localhost", 0
+
+
+def make_server(batcher, host="127.0.0.1", port=8765, unix_path=None):
+    handler = type("BoundInferenceHandler", (InferenceHandler,), {"batcher": batcher})
+    if unix_path:
+        return ThreadingUnixHTTPServer(unix_path, handler)
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    p = argparse.ArgumentParser(description="本地姿态推理服务 (动态合批)")
+    p.add_argument("--model", default="models/yolo11n-pose.pt")
+    p.add_argument("--device", default=None, help="cpu / cuda (默认自动选择)")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--unix", default=None, help="改为监听 Unix socket 路径")
+    p.add_argument("--batch-size", type=int, default=None, help="单批最大帧数 (默认取本机标定结果，未标定为 8)")
+    p.add_argument("--max-wait-ms", type=float, default=10.0, help="凑批的最大等待时延")
+    p.add_argument("--imgsz", type=int, default=None, help="输入尺寸 (默认取本机标定结果，未标定为 640)")
+    p.add_argument("--conf", type=float, default=0.5)
+    args = p.parse_args()
+
+    device = args.device
+    if device is None:
+        import torch
+        device = 'cuda' if torch.cuda.is_available() else 'cpu'
+
+    profile = load_runtime_profile()
+    if args.batch_size is None:
+        args.batch_size = profile.get("batch_size", 8)
+    # 导出权重的批大小与输入尺寸在导出时固定：要按批推理或改用其他输入尺寸时保留 .pt 权重
+    fixed_input_ok = args.batch_size <= 1 and args.imgsz in (None, profile.get("imgsz"))
+    weights = resolve_model(args.model, profile, fixed_input_ok)
+    detector = PoseDetector(weights, device=device, imgsz=args.imgsz, conf=args.conf)
+    batcher = DynamicBatcher(detector, args.batch_size, args.max_wait_ms)
+    server = make_server(batcher, args.host, args.port, args.unix)
+    where = args.unix or f"http://{args.host}:{args.port}"
+    print(f"[Server] 推理服务已启动: {where} (batch={args.batch_size}, wait={args.max_wait_ms}ms, "
+          f"weights={os.path.basename(weights)})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        batcher.stop()
+        if args.unix and os.path.exists(args.unix):
+            os.unlink(args.unix)
+        print("[Server] 已停止")
+
+
+if __name__ == "__main__":
+    main()
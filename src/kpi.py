@@ -0,0 +1,159 @@
+"""
+滑动窗口作业指标 (KPI)
+每帧把本帧的在岗人时、弯腰人时、各货架区域占用时长与新增事件累加进固定大小的分桶环形缓冲区：
+  - 近 5 分钟：60 个 5 秒桶；近 1 小时：60 个 1 分钟桶
+  - 本班次：从班次开始累计，跨班次清零 (班次划分与热力图一致)
+窗口合计随桶的进出增量维护，每帧与每次读取都是常数开销，不需要回放事件日志。
+输出每工时事件数、弯腰时长占比、各区域伸手率，并定期写入 output/kpi_snapshot.json。
+"""
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+
+from src.heatmap import current_shift_start
+
+# 每帧累加的量：统计时长 / 在岗人·秒 / 弯腰人·秒 / 伸手事件 / 弯腰事件 / 左右区域伸手次数 / 左右区域有人伸入的时长
+FIELDS = ("seconds", "worker_seconds", "bend_seconds", "reach_events", "bend_events",
+          "left_reaches", "right_reaches", "left_seconds", "right_seconds")
+_F = {name: i for i, name in enumerate(FIELDS)}
+ZONE_NAMES = ("left", "right")
+
+
+class BucketRing:
+    """span_sec 长的滑动窗口，按 bucket_sec 分桶；合计随桶滚出增量扣减"""
+
+    def __init__(self, span_sec, bucket_sec):
+        self.bucket_sec = bucket_sec
+        self.n = int(round(span_sec / bucket_sec))
+        self.buckets = np.zeros((self.n, len(FIELDS)), np.float64)
+        self.total = np.zeros(len(FIELDS), np.float64)
+        self.head = None  # 最新桶的编号 (ts // bucket_sec)
+
+    def _advance(self, ts):
+        bid = int(ts // self.bucket_sec)
+        if self.head is None:
+            self.head = bid
+        elif bid > self.head:
+            # 滚出被新桶覆盖的旧桶；停顿超过整个窗口时最多清空 n 个
+            for b in range(self.head + 1, min(bid, self.head + self.n) + 1):
+                slot = b % self.n
+                self.total -= self.buckets[slot]
+                self.buckets[slot] = 0
+                if slot == 0:
+                    # 每转一圈重算一次合计，消除浮点加减的累积误差
+                    self.total = self.buckets.sum(axis=0)
+            self.head = bid
+        return bid
+
+    def add(self, ts, values):
+        bid = self._advance(ts)
+        if bid < self.head - self.n + 1:
+            return  # 早于窗口 (时钟回拨)，丢弃
+        self.buckets[bid % self.n] += values
+        self.total += values
+
+    def sum(self, ts):
+        self._advance(ts)
+        return self.total
+
+
+class KpiAggregator:
+    def __init__(self, snapshot_path, shift_hours=8.0, first_shift_hour=6, snapshot_interval_sec=30.0,
+                 max_gap_sec=2.0, windows=(("5min", 300, 5), ("1h", 3600, 60))):
+        """
+        snapshot_path:         快照文件路径 (output/kpi_snapshot.json)
+        snapshot_interval_sec: 快照写入间隔，0 表示只在停止时写入
+        max_gap_sec:           两帧间隔的上限 (视频流断线重连期间不计入在岗时长)
+        windows:               滑动窗口 (名称, 窗口秒数, 桶秒数)
+        """
+        self.snapshot_path = snapshot_path
+        self.shift_hours = shift_hours
+        self.first_shift_hour = first_shift_hour
+        self.snapshot_interval_sec = snapshot_interval_sec
+        self.max_gap_sec = max_gap_sec
+        self.rings = {name: BucketRing(span, bucket) for name, span, bucket in windows}
+        self.shift_total = np.zeros(len(FIELDS), np.float64)
+        self.shift_start = None
+        self.values = np.zeros(len(FIELDS), np.float64)  # 本帧增量，复用
+        self.zone_active = [False, False]  # 各区域上一帧是否有人伸入 (逐区域上升沿计伸手次数)
+        self.last_ts = None
+        self.last_snapshot = 0.0
+
+    def update(self, ts, worker_count, bend_count, zone_active, events):
+        """
+        累加一帧
+        ts:          帧时间戳 (time.time())
+        bend_count:  本帧弯腰人数
+        zone_active: (左区域, 右区域) 本帧是否有手腕伸入
+        events:      EventStateMachine.update 返回的新事件 ("REACH" / "BEND")
+        """
+        dt = 0.0 if self.last_ts is None else min(max(ts - self.last_ts, 0.0), self.max_gap_sec)
+        self.last_ts = ts
+        v = self.values
+        v[_F["seconds"]] = dt
+        v[_F["worker_seconds"]] = worker_count * dt
+        v[_F["bend_seconds"]] = bend_count * dt
+        v[_F["reach_events"]] = events.count("REACH")
+        v[_F["bend_events"]] = events.count("BEND")
+        for i, zone in enumerate(ZONE_NAMES):
+            active = bool(zone_active[i])
+            v[_F[f"{zone}_reaches"]] = active and not self.zone_active[i]
+            v[_F[f"{zone}_seconds"]] = dt if active else 0.0
+            self.zone_active[i] = active
+
+        for ring in self.rings.values():
+            ring.add(ts, v)
+        shift_start = current_shift_start(datetime.fromtimestamp(ts), self.shift_hours, self.first_shift_hour)
+        if shift_start != self.shift_start:
+            self.shift_start = shift_start
+            self.shift_total[:] = 0
+        self.shift_total += v
+
+        if self.snapshot_interval_sec and ts - self.last_snapshot >= self.snapshot_interval_sec:
+            if self.last_snapshot:
+                self.write_snapshot(ts)
+            self.last_snapshot = ts
+
+    @staticmethod
+    def _kpis(total):
+        """窗口合计 -> 指标 (在岗人时为 0 时比率记为 0)"""
+        t = dict(zip(FIELDS, total.tolist()))
+        worker_hours = t["worker_seconds"] / 3600
+
+        def per_worker_hour(count):
+            return round(count / worker_hours, 2) if worker_hours > 0 else 0.0
+
+        return {
+            "seconds": round(t["seconds"], 1),
+            "worker_hours": round(worker_hours, 3),
+            "avg_workers": round(t["worker_seconds"] / t["seconds"], 2) if t["seconds"] > 0 else 0.0,
+            "reach_events": int(t["reach_events"]),
+            "bend_events": int(t["bend_events"]),
+            "events_per_worker_hour": per_worker_hour(t["reach_events"] + t["bend_events"]),
+            "bend_share": round(t["bend_seconds"] / t["worker_seconds"], 3) if t["worker_seconds"] > 0 else 0.0,
+            "zones": {zone: {"reaches": int(t[f"{zone}_reaches"]),
+                             "reach_per_worker_hour": per_worker_hour(t[f"{zone}_reaches"]),
+                             "active_share": round(t[f"{zone}_seconds"] / t["seconds"], 3) if t["seconds"] > 0 else 0.0}
+                      for zone in ZONE_NAMES},
+        }
+
+    def snapshot(self, ts=None):
+        ts = self.last_ts if ts is None else ts
+        out = {name: self._kpis(ring.sum(ts)) for name, ring in self.rings.items()} if ts is not None else {}
+        out["shift"] = self._kpis(self.shift_total)
+        out["shift"]["start"] = self.shift_start.isoformat(timespec="minutes") if self.shift_start else None
+        return out
+
+    def write_snapshot(self, ts=None):
+        """写入快照文件 (先写临时文件再替换，读取方不会读到半个文件)"""
+        ts = self.last_ts if ts is None else ts
+        if ts is None:
+            return
+        data = {"generated": datetime.fromtimestamp(ts).isoformat(timespec="seconds"), "windows": self.snapshot(ts)}
+        tmp = f"{self.snapshot_path}.tmp"
+        os.makedirs(os.path.dirname(self.snapshot_path) or ".", exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.snapshot_path)
@@ -0,0 +1,134 @@
+"""
+运行中按需性能采样
+由看板按钮、SIGUSR1 信号或命令行触发，对工作线程接下来的 N 帧同时采集：
+  - cProfile 确定性统计 (cprofile.prof，可用 snakeviz 打开；cprofile_top.txt 为累计耗时前列)
+  - 工作线程调用栈采样，输出 flamegraph.pl / speedscope 可直接读取的折叠栈 (stacks.folded)
+  - torch.profiler CPU 算子 (torch_trace.json / torch_ops.txt，本进程已加载 torch 时)
+  - StageTimer 的逐阶段起止时间，输出 Chrome Trace (stages_trace.json，chrome://tracing 或 Perfetto 打开)
+结果写入 output/profiles/<时间戳>/。未触发时工作线程每帧只多一次属性判断。
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+
+class StackSampler(threading.Thread):
+    """定时抓取目标线程的 Python 调用栈，累计为折叠栈计数"""
+
+    def __init__(self, thread_id, interval=0.005):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.stop_event = threading.Event()
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+
+class ProfilerCapture:
+    def __init__(self, out_dir, stage_timer, default_frames=100):
+        self.out_dir = out_dir
+        self.stage_timer = stage_timer
+        self.default_frames = default_frames
+        self.requested = 0  # 待开始的采样帧数 (任意线程写入)，工作线程在帧边界处接手
+        self.active = False
+        self.remaining = 0
+        self.frames = 0
+        self.t0 = 0.0
+        self.profile = None
+        self.sampler = None
+        self.torch_prof = None
+
+    def request(self, frames=None):
+        """请求采样接下来的 frames 帧 (线程安全：只写一个整数)；正在采样时忽略"""
+        if not self.active:
+            self.requested = frames or self.default_frames
+
+    def on_frame_boundary(self):
+        """
+        工作线程在每帧开始前调用 (仅在 requested / active 为真时)
+        返回采样结束后的输出目录，其余情况返回 None
+        """
+        if not self.active:
+            self._begin(self.requested)
+            self.requested = 0
+            return None
+        self.frames += 1
+        self.remaining -= 1
+        if self.remaining <= 0:
+            return self.finish()
+        return None
+
+    def _begin(self, frames):
+        self.active = True
+        self.remaining = frames
+        self.frames = 0
+        self.stage_timer.spans = []
+        self.sampler = StackSampler(threading.get_ident())
+        self.sampler.start()
+        self.torch_prof = None
+        if "torch" in sys.modules:
+            # 只在本进程已经加载了 torch 时采集 (推理服务客户端模式不为此额外导入 torch)
+            import torch
+            self.torch_prof = torch.profiler.profile(activities=[torch.profiler.ProfilerActivity.CPU])
+            self.torch_prof.__enter__()
+        self.profile = cProfile.Profile()
+        self.t0 = time.perf_counter()
+        self.profile.enable()
+
+    def finish(self):
+        """结束采样并写出结果 (停止监控时若仍在采样也会调用)，返回输出目录"""
+        if not self.active:
+            return None
+        self.profile.disable()
+        wall = time.perf_counter() - self.t0
+        self.sampler.stop_event.set()
+        self.sampler.join()
+        if self.torch_prof is not None:
+            self.torch_prof.__exit__(None, None, None)
+        spans, self.stage_timer.spans = self.stage_timer.spans, None
+        self.active = False
+
+        out = os.path.join(self.out_dir, datetime.now().strftime("%Y%m%d_%H%M%S"))
+        os.makedirs(out, exist_ok=True)
+        self.profile.dump_stats(os.path.join(out, "cprofile.prof"))
+        text = io.StringIO()
+        pstats.Stats(self.profile, stream=text).sort_stats("cumulative").print_stats(40)
+        with open(os.path.join(out, "cprofile_top.txt"), "w", encoding="utf-8") as f:
+            f.write(f"frames: {self.frames}  wall: {wall:.3f}s  ({self.frames / max(wall, 1e-9):.2f} fps)\n")
+            f.write(text.getvalue())
+        with open(os.path.join(out, "stacks.folded"), "w", encoding="utf-8") as f:
+            for stack, count in self.sampler.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        self._write_stage_trace(os.path.join(out, "stages_trace.json"), spans)
+        if self.torch_prof is not None:
+            self.torch_prof.export_chrome_trace(os.path.join(out, "torch_trace.json"))
+            with open(os.path.join(out, "torch_ops.txt"), "w", encoding="utf-8") as f:
+                f.write(self.torch_prof.key_averages().table(sort_by="self_cpu_time_total", row_limit=40))
+        self.profile = self.sampler = self.torch_prof = None
+        return out
+
+    def _write_stage_trace(self, path, spans):
+        """Chrome Trace Event 格式：每个阶段一个完整事件 (ph=X)，时间单位微秒"""
+        events = [{"name": "process_name", "ph": "M", "pid": os.getpid(), "args": {"name": "AIWorker"}}]
+        for stage, start, end in spans:
+            events.append({"name": stage, "cat": "stage", "ph": "X", "pid": os.getpid(), "tid": 0,
+                           "ts": round((start - self.t0) * 1e6, 1), "dur": round((end - start) * 1e6, 1)})
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
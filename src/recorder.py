@@ -0,0 +1,173 @@
+"""
+异步录像
+推理线程只负责把标注画面缩放进预分配的空闲槽位并入队 (不等待编码)；
+独立的编码线程从有界队列取帧写入视频文件，按时长 / 文件大小自动分段。
+没有空闲槽位时直接丢帧并计数，绝不阻塞推理。
+帧按推理速率到达而文件按固定 fps 编码：编码线程按每帧的提交时间补写重复帧 / 跳过多余帧，
+使回放速度与现场一致 (推理慢于 fps 时不会变成快放)。
+"""
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+
+class AsyncVideoRecorder:
+    def __init__(self, out_dir, fps=10.0, width=None, segment_sec=600.0, segment_mb=0.0, queue_size=32,
+                 fourcc="mp4v", prefix="record", decimate=True, max_gap_sec=2.0):
+        """
+        out_dir:     输出目录
+        fps:         录像帧率
+        decimate:    是否按 fps 做墙钟抽帧 (推理更快时多余帧不录)；False 时每次 submit 都录
+        width:       输出宽度，高度按比例计算；None 表示保持原分辨率
+        segment_sec: 单个文件最长时长 (秒)，0 表示不按时长分段
+        segment_mb:  单个文件最大体积 (MB)，0 表示不按体积分段
+        queue_size:  预分配槽位数 (即队列上限)
+        max_gap_sec: 两帧间隔超过该值 (视频流断线重连等) 时最多只补这么长的重复帧，其余时间从录像中略去
+        """
+        self.out_dir = out_dir
+        self.fps = fps
+        self.decimate = decimate
+        self.width = width
+        self.segment_sec = segment_sec
+        self.segment_bytes = segment_mb * 1024 * 1024
+        self.queue_size = max(1, int(queue_size))
+        self.fourcc = cv2.VideoWriter_fourcc(*fourcc)
+        self.prefix = prefix
+        self.max_gap_sec = max_gap_sec
+        os.makedirs(out_dir, exist_ok=True)
+
+        self.frame_size = None  # (w, h)，首帧到达时确定
+        self.source_shape = None
+        self.free_slots = queue.Queue()
+        self.pending = queue.Queue()
+        self.last_submit = 0.0
+
+        self.writer = None
+        self.segment_path = None
+        self.segment_start = 0.0  # 本段第一帧的提交时间
+        self.segment_frames = 0  # 本段已写入的帧数 (含补写的重复帧)
+        self.next_size_check = 0
+
+        # written: 写入的提交帧；duplicated: 补写的重复帧；skipped: 快于 fps 而跳过的帧
+        self.counters = {"submitted": 0, "written": 0, "duplicated": 0, "skipped": 0, "dropped": 0, "segments": 0}
+        self.thread = threading.Thread(target=self._loop, name="video-recorder", daemon=True)
+        self.thread.start()
+
+    # ------------------------------------------------------------------
+    # 推理线程侧
+    # ------------------------------------------------------------------
+    def _allocate(self, frame_shape):
+        h, w = frame_shape[:2]
+        if self.width and self.width < w:
+            out_w = int(self.width) // 2 * 2
+            out_h = int(round(h * out_w / w)) // 2 * 2
+        else:
+            out_w, out_h = w, h
+        self.frame_size = (out_w, out_h)
+        self.free_slots = queue.Queue()
+        for _ in range(self.queue_size):
+            self.free_slots.put(np.empty((out_h, out_w, 3), np.uint8))
+        self.source_shape = frame_shape
+
+    def submit(self, frame):
+        """提交一帧 (非阻塞)，返回是否入队"""
+        now = time.time()
+        if self.decimate and self.fps and now - self.last_submit < 1.0 / self.fps:
+            return False  # 抽帧
+        self.last_submit = now
+
+        if self.frame_size is None or frame.shape != self.source_shape:
+            # 分辨率变化：旧槽位由编码线程用完后自然丢弃，这里换一组新的，并通知换段
+            self._allocate(frame.shape)
+            self.pending.put(None)
+
+        try:
+            slot = self.free_slots.get_nowait()
+        except queue.Empty:
+            self.counters["dropped"] += 1
+            return False
+
+        if slot.shape[:2] == frame.shape[:2]:
+            np.copyto(slot, frame)
+        else:
+            cv2.resize(frame, self.frame_size, dst=slot, interpolation=cv2.INTER_AREA)
+        self.pending.put((slot, self.free_slots, now))
+        self.counters["submitted"] += 1
+        return True
+
+    def stop(self):
+        """停止并等待队列中剩余帧写完"""
+        self.pending.put(StopIteration)
+        self.thread.join(timeout=30)
+
+    def stats(self):
+        s = dict(self.counters)
+        s["queued"] = self.pending.qsize()
+        s["segment"] = os.path.basename(self.segment_path) if self.segment_path else ""
+        return s
+
+    # ------------------------------------------------------------------
+    # 编码线程侧
+    # ------------------------------------------------------------------
+    def _open_segment(self, size, ts):
+        name = f"{self.prefix}_{datetime.fromtimestamp(ts).strftime('%Y%m%d_%H%M%S_%f')[:-3]}.mp4"
+        self.segment_path = os.path.join(self.out_dir, name)
+        self.writer = cv2.VideoWriter(self.segment_path, self.fourcc, self.fps or 25.0, size)
+        self.segment_start = ts
+        self.segment_frames = 0
+        self.next_size_check = 50
+        self.counters["segments"] += 1
+
+    def _close_segment(self):
+        if self.writer is not None:
+            self.writer.release()  # 必须释放，否则文件无法播放
+            self.writer = None
+
+    def _segment_full(self, ts):
+        if self.segment_sec and ts - self.segment_start >= self.segment_sec:
+            return True
+        # 文件大小每 50 帧检查一次，避免频繁 stat
+        if self.segment_bytes and self.segment_frames >= self.next_size_check:
+            self.next_size_check = self.segment_frames + 50
+            try:
+                return os.path.getsize(self.segment_path) >= self.segment_bytes
+            except OSError:
+                return False
+        return False
+
+    def _loop(self):
+        while True:
+            item = self.pending.get()
+            if item is StopIteration:
+                break
+            if item is None:
+                self._close_segment()  # 分辨率变化，下一帧开新段
+                continue
+
+            slot, pool, ts = item
+            if self.writer is None or self._segment_full(ts):
+                self._close_segment()
+                self._open_segment((slot.shape[1], slot.shape[0]), ts)
+            # 按提交时间对齐到 fps 时间轴：这一帧应覆盖到第 due 帧为止
+            fps = self.fps or 25.0
+            due = int((ts - self.segment_start) * fps) + 1
+            repeats = min(due - self.segment_frames, max(1, int(self.max_gap_sec * fps)))
+            if repeats <= 0:
+                self.counters["skipped"] += 1
+            else:
+                for _ in range(repeats):
+                    self.writer.write(slot)
+                self.segment_frames += repeats
+                self.counters["written"] += 1
+                self.counters["duplicated"] += repeats - 1
+                if self.segment_frames < due:
+                    # 长时间断流：超出 max_gap_sec 的部分不补，时间轴顺延
+                    self.segment_start += (due - self.segment_frames) / fps
+            pool.put(slot)  # 归还槽位
+
+        self._close_segment()
@@ -0,0 +1,50 @@
+"""
+本机运行参数档案 (data/runtime_profile.json)
+由 `python check_env.py --calibrate` 在目标机器上实测生成：torch / OpenCV 线程数、推理后端与权重、
+输入尺寸、批大小。PoseDetector / AIWorker / 推理服务启动时读取，显式传入的参数优先于档案。
+文件不存在或损坏时返回空档案，各处沿用原来的默认值。
+"""
+import json
+import os
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+PROFILE_PATH = os.path.join(PROJECT_ROOT, "data", "runtime_profile.json")
+
+_cache = {}
+
+
+def load_runtime_profile(path=PROFILE_PATH):
+    """读取档案 (按路径缓存，同一进程只读一次)"""
+    if path not in _cache:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                _cache[path] = json.load(f)
+        except (OSError, ValueError):
+            _cache[path] = {}
+    return _cache[path]
+
+
+def apply_thread_settings(profile, torch_threads=True, opencv_threads=True):
+    """按档案设置线程数；torch 只在已被导入时设置，不为此额外加载"""
+    import sys
+
+    if opencv_threads and profile.get("opencv_threads"):
+        import cv2
+        cv2.setNumThreads(int(profile["opencv_threads"]))
+    if torch_threads and profile.get("torch_threads") and "torch" in sys.modules:
+        sys.modules["torch"].set_num_threads(int(profile["torch_threads"]))
+
+
+def resolve_model(model_path, profile, fixed_input_ok=True):
+    """
+    档案选用了导出后端 (ONNX / OpenVINO ...) 且源权重与 model_path 相同时，返回导出后的权重路径；
+    否则原样返回 model_path
+    fixed_input_ok: 导出权重的输入尺寸与批大小在导出时已固定；级联 / 分块推理会按其他尺寸或批量调用，
+                    此时传 False 保留 .pt 权重
+    """
+    weights = profile.get("weights")
+    if not fixed_input_ok or not weights or os.path.basename(model_path) != profile.get("source_model"):
+        return model_path
+    if not os.path.isabs(weights):
+        weights = os.path.join(PROJECT_ROOT, weights)
+    return weights if os.path.exists(weights) else model_path
@@ -0,0 +1,132 @@
+"""
+跨进程三缓冲帧环 (multiprocessing.shared_memory)
+子进程 (FrameRingWriter) 把 RGB 画面直接写进共享内存槽位，主进程 (FrameRingReader) 只拿最新一帧，
+读写双方各占一个槽位，第三个槽位用于交换，整个过程不复制像素。
+槽位下标放在一个带锁的共享整数数组里 (control)，由主进程创建后传给子进程；
+分辨率变化时写端重新分配槽位并递增代号 (GEN)，读端收到新槽位名后重新挂载。
+"""
+import multiprocessing as mp
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+# control 数组各字段
+GEN, SPARE, LATEST, READING, FRESH, SEQ = range(6)
+SLOTS = 3
+
+
+def make_control(ctx=None):
+    """创建控制数组 (需在启动子进程前创建并作为参数传入)"""
+    return (ctx or mp).Array("q", 6)
+
+
+class FrameRingWriter:
+    def __init__(self, control, on_new_ring):
+        """
+        on_new_ring(gen, names, shape): 重新分配槽位后回调，负责把槽位名通知给读端
+        """
+        self.control = control
+        self.on_new_ring = on_new_ring
+        self.shms = []
+        self.arrays = []
+        self.shape = None
+        self.gen = 0
+
+    def buffer(self, h, w):
+        """返回当前可写槽位 (h, w, 3) uint8，分辨率变化时先重新分配"""
+        if self.shape != (h, w, 3):
+            self._allocate((h, w, 3))
+        return self.arrays[self.control[SPARE]]  # SPARE 只有写端会改，无需加锁
+
+    def commit(self):
+        """
+        发布刚写好的槽位：与 LATEST 交换
+        返回是否需要通知读端 (上一帧已被取走)；读端还没取走时它收到的那次通知会直接取到这一帧
+        """
+        c = self.control
+        with c.get_lock():
+            c[SPARE], c[LATEST] = c[LATEST], c[SPARE]
+            notify = not c[FRESH]
+            c[FRESH] = 1
+            c[SEQ] += 1
+        return notify
+
+    def _allocate(self, shape):
+        self.close()
+        size = int(np.prod(shape))
+        self.shms = [shared_memory.SharedMemory(create=True, size=size) for _ in range(SLOTS)]
+        self.arrays = [np.ndarray(shape, np.uint8, buffer=s.buf) for s in self.shms]
+        self.shape = shape
+        self.gen += 1
+        c = self.control
+        with c.get_lock():
+            c[GEN], c[SPARE], c[LATEST], c[READING], c[FRESH] = self.gen, 0, 1, 2, 0
+        self.on_new_ring(self.gen, [s.name for s in self.shms], shape)
+
+    def close(self):
+        self.arrays = []
+        for s in self.shms:
+            s.close()
+            s.unlink()  # 读端已挂载的映射在其关闭前仍然有效
+        self.shms = []
+
+
+def _attach_segment(name):
+    """
+    挂载写端创建的共享内存，不登记到 resource_tracker (槽位的生命周期由写端负责)
+    Python < 3.13 挂载时也会登记：独立的 tracker 退出时会报告泄漏并再次 unlink；
+    与写端共用 tracker 时 (spawn 子进程) 事后 unregister 又会把写端的登记一并删掉，
+    所以改为挂载期间跳过登记
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13 没有 track 参数
+        pass
+    register = resource_tracker.register
+    resource_tracker.register = lambda n, rtype: None if rtype == "shared_memory" else register(n, rtype)
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+class FrameRingReader:
+    def __init__(self, control):
+        self.control = control
+        self.shms = []
+        self.arrays = []
+        self.gen = 0
+        self.retired = []  # 仍有外部引用 (如尚未释放的 QImage) 而暂时无法关闭的映射
+
+    def attach(self, gen, names, shape):
+        self._release()
+        self.shms = [_attach_segment(n) for n in names]
+        self.arrays = [np.ndarray(shape, np.uint8, buffer=s.buf) for s in self.shms]
+        self.gen = gen
+
+    def acquire(self):
+        """
+        取最新一帧：返回 (array, seq)，没有新帧或槽位尚未挂载时返回 None
+        返回的数组在下一次 acquire 之前不会被写端覆盖
+        """
+        c = self.control
+        with c.get_lock():
+            if c[GEN] != self.gen or not c[FRESH] or not self.arrays:
+                return None
+            c[READING], c[LATEST] = c[LATEST], c[READING]
+            c[FRESH] = 0
+            idx, seq = c[READING], c[SEQ]
+        return self.arrays[idx], seq
+
+    def _release(self):
+        self.arrays = []
+        pending, self.retired = self.retired + self.shms, []
+        self.shms = []
+        for s in pending:
+            try:
+                s.close()
+            except BufferError:
+                self.retired.append(s)
+
+    def close(self):
+        self._release()
@@ -0,0 +1,40 @@
+import time
+
+
+class StageTimer:
+    """
+    逐阶段耗时统计 (读帧 / 推理 / 判定绘制 / 发布 ...)
+    工作线程每帧调用 start_frame()，每完成一个阶段调用 mark(stage)；
+    监控方 (浸泡测试 / 性能采样) 定期调用 snapshot() 取走区间内的平均耗时。
+    开销只有一次 perf_counter 与两次字典累加。
+    spans 不为 None 时额外记录每个阶段的 (名称, 起, 止)，供性能采样输出时间线 (src/profiler_capture.py)。
+    """
+
+    def __init__(self):
+        self.totals = {}
+        self.counts = {}
+        self.frames = 0
+        self.spans = None
+        self._t = time.perf_counter()
+
+    def start_frame(self):
+        self._t = time.perf_counter()
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        if self.spans is not None:
+            self.spans.append((stage, self._t, now))
+        self.totals[stage] = self.totals.get(stage, 0.0) + (now - self._t)
+        self.counts[stage] = self.counts.get(stage, 0) + 1
+        self._t = now
+
+    def end_frame(self):
+        self.frames += 1
+
+    def snapshot(self, reset=True):
+        """返回 {stage: 平均毫秒}，reset=True 时开始新的统计区间"""
+        totals, counts = self.totals, self.counts
+        if reset:
+            # 整体替换而非清空，避免与工作线程的累加交错
+            self.totals, self.counts = {}, {}
+        return {k: round(totals[k] * 1000 / counts[k], 3) for k in list(totals) if counts.get(k)}
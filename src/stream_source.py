@@ -0,0 +1,150 @@
+"""
+网络视频流接入 (RTSP / HTTP)
+独立的抓帧线程持续从相机拉流，只保留最新一帧：推理比相机帧率慢时，旧帧直接丢弃并计数，
+而不是在解码缓冲区里越积越多，保证端到端告警延迟不随运行时间增长。
+断流后按指数退避自动重连。
+"""
+import threading
+import time
+
+import cv2
+
+STREAM_SCHEMES = ("rtsp://", "rtsps://", "rtmp://", "http://", "https://", "udp://", "tcp://")
+
+
+def is_stream_url(path):
+    return isinstance(path, str) and path.lower().startswith(STREAM_SCHEMES)
+
+
+class LatestFrameGrabber:
+    """
+    最新帧抓取器 (三缓冲)
+    - 抓帧线程写入 spare 缓冲，写完与 latest 交换
+    - read() 把 latest 与 reading 交换后返回 reading，抓帧线程永远不会改写消费者手里的帧
+    三块缓冲区在分辨率不变时循环复用，不产生逐帧内存分配。
+    """
+
+    def __init__(self, url, reconnect_initial=0.5, reconnect_max=10.0, open_timeout_ms=5000,
+                 read_timeout_ms=5000, stale_after=1.0):
+        self.url = url
+        self.reconnect_initial = reconnect_initial
+        self.reconnect_max = reconnect_max
+        self.open_timeout_ms = open_timeout_ms
+        self.read_timeout_ms = read_timeout_ms
+        self.stale_after = stale_after  # 帧在到达后超过该秒数仍未被处理则视为过期
+
+        self._cond = threading.Condition()
+        self._spare = None
+        self._latest = None
+        self._reading = None
+        self._latest_info = None
+        self._fresh = False  # latest 是否尚未被读取
+        self._running = False
+        self._thread = None
+
+        self.connected = False
+        self.counters = {"grabbed": 0, "dropped": 0, "stale": 0, "reconnects": 0, "read_errors": 0}
+        self.last_error = ""
+
+    # ------------------------------------------------------------------
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, name="stream-grabber", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=self.read_timeout_ms / 1000.0 + 1)
+            self._thread = None
+
+    def _open(self):
+        cap = cv2.VideoCapture(
+            self.url, cv2.CAP_FFMPEG,
+            [cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, self.open_timeout_ms,
+             cv2.CAP_PROP_READ_TIMEOUT_MSEC, self.read_timeout_ms])
+        if cap.isOpened():
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # 部分后端支持：尽量少在驱动侧排队
+            return cap
+        cap.release()
+        return None
+
+    def _loop(self):
+        backoff = self.reconnect_initial
+        first = True
+        while self._running:
+            cap = self._open()
+            if cap is None:
+                self.last_error = "无法打开视频流"
+                self._sleep(backoff)
+                backoff = min(backoff * 2, self.reconnect_max)
+                continue
+
+            if not first:
+                self.counters["reconnects"] += 1
+            first = False
+            self.connected = True
+            backoff = self.reconnect_initial
+
+            while self._running:
+                if not cap.grab():
+                    self.counters["read_errors"] += 1
+                    self.last_error = "读取失败，准备重连"
+                    break
+                recv_ts = time.time()
+                ok, img = cap.retrieve(self._spare)
+                if not ok or img is None:
+                    self.counters["read_errors"] += 1
+                    continue
+
+                info = {"seq": self.counters["grabbed"], "recv_ts": recv_ts,
+                        "source_ms": cap.get(cv2.CAP_PROP_POS_MSEC)}
+                with self._cond:
+                    if self._fresh:
+                        self.counters["dropped"] += 1  # 上一帧还没被消费就被覆盖
+                    self._spare, self._latest = self._latest, img
+                    self._latest_info = info
+                    self._fresh = True
+                    self.counters["grabbed"] += 1
+                    self._cond.notify()
+
+            self.connected = False
+            cap.release()
+            if self._running:
+                self._sleep(backoff)
+                backoff = min(backoff * 2, self.reconnect_max)
+
+    def _sleep(self, seconds):
+        end = time.time() + seconds
+        while self._running and time.time() < end:
+            time.sleep(min(0.1, end - time.time()))
+
+    # ------------------------------------------------------------------
+    def read(self, timeout=1.0):
+        """
+        取最新帧，返回 (ok, frame, info)
+        info: seq (抓帧序号), recv_ts (到达时刻, time.time()), source_ms (流内时间戳), age (已等待秒数)
+        frame 在下一次 read() 之前保持有效
+        """
+        with self._cond:
+            if not self._fresh:
+                self._cond.wait_for(lambda: self._fresh or not self._running, timeout)
+            if not self._fresh:
+                return False, None, None
+            self._reading, self._latest = self._latest, self._reading
+            info = dict(self._latest_info)
+            self._fresh = False
+
+        info["age"] = time.time() - info["recv_ts"]
+        if info["age"] > self.stale_after:
+            self.counters["stale"] += 1
+        return True, self._reading, info
+
+    def stats(self):
+        s = dict(self.counters)
+        s["connected"] = self.connected
+        s["last_error"] = self.last_error
+        return s
@@ -0,0 +1,165 @@
+"""
+高分辨率分块推理 (4K 广角货架相机)
+整帧缩放到模型输入尺寸后，通道远端的拣货员只剩几十个像素，关键点置信度掉到判定门限以下。
+分块模式把整帧 (或仅 ROI 外扩区域) 切成互相重叠的等尺寸图块，一次 infer_batch 批量推理，
+再把各图块结果平移回整帧坐标，按框重叠合并接缝两侧重复检出的同一个人。
+可选叠加一次整帧低分辨率推理，覆盖跨越多个图块的近处人员。
+对外接口与 PoseDetector.infer 一致，可直接交给 AIWorker 使用。
+"""
+import time
+
+import numpy as np
+
+
+def tile_origins(length, tile, overlap):
+    """一维切分：返回各图块起点，末块贴齐边缘 (所有图块等长，便于批量推理)"""
+    if length <= tile:
+        return [0]
+    step = max(1, int(tile * (1 - overlap)))
+    starts = list(range(0, length - tile, step))
+    starts.append(length - tile)
+    return starts
+
+
+def _ios(box, boxes):
+    """box 与 boxes 的交集 / 较小框面积 (被接缝截断的半身框与完整框也能判为同一人)"""
+    x1 = np.maximum(box[0], boxes[:, 0])
+    y1 = np.maximum(box[1], boxes[:, 1])
+    x2 = np.minimum(box[2], boxes[:, 2])
+    y2 = np.minimum(box[3], boxes[:, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area = (box[2] - box[0]) * (box[3] - box[1])
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    return inter / np.maximum(np.minimum(area, areas), 1e-6)
+
+
+def merge_detections(kpts, boxes, ios_thresh=0.6):
+    """
+    合并重复检出：按置信度从高到低，与已保留的框重叠度超过门限的视为同一人，
+    框取并集，每个关键点取两者中置信度更高的一个
+    """
+    if len(boxes) <= 1:
+        return kpts, boxes
+    order = np.argsort(-boxes[:, 4])
+    kept_k, kept_b = [], []
+    for i in order:
+        if kept_b:
+            overlap = _ios(boxes[i], np.array(kept_b))
+            j = int(np.argmax(overlap))
+            if overlap[j] > ios_thresh:
+                kb, kk = kept_b[j], kept_k[j]
+                kb[:2] = np.minimum(kb[:2], boxes[i, :2])
+                kb[2:4] = np.maximum(kb[2:4], boxes[i, 2:4])
+                better = kpts[i, :, 2] > kk[:, 2]
+                kk[better] = kpts[i, better]
+                continue
+        kept_b.append(boxes[i].copy())
+        kept_k.append(kpts[i].copy())
+    return np.array(kept_k, np.float32), np.array(kept_b, np.float32)
+
+
+class TiledPoseDetector:
+    NUM_KPTS = 17
+
+    def __init__(self, detector, tile=960, overlap=0.2, full_frame=True, latency_budget_ms=0.0, max_batch=8,
+                 region_margin=0.15, merge_ios=0.6):
+        """
+        detector:          PoseDetector (需支持 infer_batch)，或只有 infer 的推理服务客户端 (逐块调用)
+        tile:              图块边长 (原图像素)，每块再由模型缩放到 imgsz
+        overlap:           相邻图块重叠比例，应大于远处人体宽度占图块的比例
+        full_frame:        额外做一次整帧推理，覆盖跨越多个图块的近处人员
+        latency_budget_ms: 单次批量推理的耗时预算，据此选择批大小 (0 = 全部图块一批，受 max_batch 限制)
+        region_margin:     只对 ROI 分块时，ROI 外接框向外扩展的比例 (伸手时身体大多在货架区域之外)
+        """
+        self.detector = detector
+        self.tile = tile
+        self.overlap = overlap
+        self.full_frame = full_frame
+        self.latency_budget_ms = latency_budget_ms
+        self.max_batch = max_batch
+        self.region_margin = region_margin
+        self.merge_ios = merge_ios
+        self.calculate_angle = detector.calculate_angle
+
+        self.region = None  # (x1, y1, x2, y2)，None 表示整帧
+        self.layout = None  # (帧尺寸, 区域) -> 图块列表 [(x, y, w, h)]
+        self.tiles = []
+        self.batch_size = None  # 按图块尺寸标定，图块尺寸变化时重新标定
+        self.batch_shape = None
+
+    def set_region_from_contours(self, cnt_left, cnt_right, frame_shape):
+        """只对 ROI 外接框 (外扩 region_margin) 分块；两个区域都未设置时恢复整帧"""
+        cnts = [c for c in (cnt_left, cnt_right) if c is not None]
+        if not cnts:
+            self.region = None
+            return
+        pts = np.concatenate(cnts)
+        x1, y1 = pts.min(0)
+        x2, y2 = pts.max(0)
+        mx, my = (x2 - x1) * self.region_margin, (y2 - y1) * self.region_margin
+        h, w = frame_shape[:2]
+        self.region = (max(0, int(x1 - mx)), max(0, int(y1 - my)), min(w, int(x2 + mx)), min(h, int(y2 + my)))
+
+    def _layout(self, frame_shape):
+        h, w = frame_shape[:2]
+        key = ((h, w), self.region)
+        if self.layout != key:
+            x1, y1, x2, y2 = self.region or (0, 0, w, h)
+            tw, th = min(self.tile, x2 - x1), min(self.tile, y2 - y1)
+            self.tiles = [(x1 + x, y1 + y, tw, th)
+                          for y in tile_origins(y2 - y1, th, self.overlap)
+                          for x in tile_origins(x2 - x1, tw, self.overlap)]
+            self.layout = key
+        return self.tiles
+
+    def _calibrate(self, crops):
+        """按耗时预算选批大小：逐级翻倍试跑，取单批耗时不超预算的最大值"""
+        limit = min(self.max_batch, len(crops))
+        if not self.latency_budget_ms:
+            return limit
+        chosen, b = 1, 1
+        self.detector.infer_batch(crops[:1])  # 预热该分辨率的缓冲区
+        while b <= limit:
+            t0 = time.perf_counter()
+            self.detector.infer_batch(crops[:b])
+            if (time.perf_counter() - t0) * 1000 > self.latency_budget_ms:
+                break
+            chosen, b = b, b * 2
+        print(f"[Tiled] 图块 {crops[0].shape[1]}x{crops[0].shape[0]} × {len(crops)}，批大小 {chosen}")
+        return chosen
+
+    def _run_tiles(self, frame, tiles):
+        crops = [frame[y:y + th, x:x + tw] for x, y, tw, th in tiles]
+        if not hasattr(self.detector, "infer_batch"):
+            return [tuple(a.copy() for a in self.detector.infer(c)) for c in crops]
+        if self.batch_shape != crops[0].shape:
+            self.batch_size = self._calibrate(crops)
+            self.batch_shape = crops[0].shape
+        results = []
+        for i in range(0, len(crops), self.batch_size):
+            # infer_batch 返回内部缓冲区视图，下一批会覆盖，先拷贝
+            results += [(k.copy(), b.copy()) for k, b in self.detector.infer_batch(crops[i:i + self.batch_size])]
+        return results
+
+    def infer(self, frame):
+        """返回整帧坐标的 (keypoints (N,17,3), boxes (N,5))，与 PoseDetector.infer 一致"""
+        if frame is None:
+            return self.detector.infer(None)
+        tiles = self._layout(frame.shape)
+        all_k, all_b = [], []
+        for (x, y, _, _), (k, b) in zip(tiles, self._run_tiles(frame, tiles)):
+            if len(b):
+                k[..., 0] += x
+                k[..., 1] += y
+                b[:, 0:4:2] += x
+                b[:, 1:4:2] += y
+                all_k.append(k)
+                all_b.append(b)
+        if self.full_frame and (len(tiles) > 1 or self.region is not None):
+            k, b = self.detector.infer(frame)
+            if len(b):
+                all_k.append(k.copy())
+                all_b.append(b.copy())
+        if not all_b:
+            return np.zeros((0, self.NUM_KPTS, 3), np.float32), np.zeros((0, 5), np.float32)
+        return merge_detections(np.concatenate(all_k), np.concatenate(all_b), self.merge_ios)
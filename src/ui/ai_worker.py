@@ -3,12 +3,25 @@ import time
 import os
 import json
 import csv
-import torch
+import http.client
+import traceback
 import numpy as np
 from datetime import datetime
 from PySide6.QtCore import QThread, Signal, Slot
 from PySide6.QtGui import QImage
+from src.behavior import EventStateMachine, analyze_frame, roi_contours
+from src.cascade_inference import CascadePoseDetector
 from src.core_inference import PoseDetector
+from src.evidence_store import EvidenceStore
+from src.frame_pool import FramePool
+from src.heatmap import InteractionHeatmap
+from src.kpi import KpiAggregator
+from src.profiler_capture import ProfilerCapture
+from src.runtime_profile import apply_thread_settings, load_runtime_profile, resolve_model
+from src.recorder import AsyncVideoRecorder
+from src.stage_timer import StageTimer
+from src.stream_source import LatestFrameGrabber, is_stream_url
+from src.tiled_inference import TiledPoseDetector
 
 
 class AIWorker(QThread):
@@ -17,24 +30,40 @@ class AIWorker(QThread):
     log_signal = Signal(str)
     finished_signal = Signal()
 
-    def __init__(self, model_path, video_path):
+    SERVICE_RETRY_MAX_SEC = 10.0  # 推理服务不可用时的最大重试间隔
+
+    def __init__(self, model_path, video_path, detector=None, stream_options=None, recorder_options=None,
+                 evidence_options=None, heatmap_options=None, tile_options=None,
+                 cascade_options=None, kpi_options=None):
         super().__init__()
         self.model_path = model_path
-        self.video_path = video_path
+        self.video_path = video_path  # 本地文件 (循环播放) 或 RTSP/HTTP 视频流地址
+        self.stream_options = stream_options or {}  # 透传给 LatestFrameGrabber (重连退避 / 超时等)
+        self.recorder_options = recorder_options  # 非空时开启标注画面录像，透传给 AsyncVideoRecorder
+        # 非空时开启高分辨率分块推理，透传给 TiledPoseDetector；roi_only=True 时只对 ROI 外扩区域分块
+        self.tile_options = dict(tile_options) if tile_options else None
+        # 非空时开启两级级联推理，透传给 CascadePoseDetector；stage1_model 可指定单独的第一级权重
+        self.cascade_options = dict(cascade_options) if cascade_options else None
+        self.detector = detector  # 可复用后台预加载好的模型 / 推理服务客户端 (PoseClient)，避免重复加载
         self.running = True
+        self.realtime = True  # 本地文件按原始帧率节流；浸泡测试等场景置 False 全速运行
+        self.stage_timer = StageTimer()  # 逐阶段耗时，供浸泡测试 / 性能采样读取
+        self.frame_pool = FramePool()  # 解码 / 画布 / 显示图像按分辨率预分配并循环复用
 
         self.show_roi = True
         self.show_skeleton = True
         self.show_angles = False
+        self.show_heatmap = False
 
-        # ROI 配置
-        self.config_path = os.path.join(os.path.dirname(video_path), "roi_config.json")
+        # ROI 配置 (视频流没有所在目录，统一放在项目 data/ 下)
+        config_dir = os.path.join(os.getcwd(), "data") if is_stream_url(video_path) else os.path.dirname(video_path)
+        self.config_path = os.path.join(config_dir, "roi_config.json")
         self.roi_left = []
         self.roi_right = []
         self.load_config()
 
         self.counters = {"reach": 0, "bend": 0}
-        self.state_memory = {"is_reaching": False, "is_bending": False}
+        self.event_state = EventStateMachine()
 
         # --- 📂 修复：绝对路径输出 ---
         # 获取当前运行脚本的根目录 (即 main_window.py 运行的地方)
@@ -46,6 +75,14 @@ class AIWorker(QThread):
 
         # 自动创建目录
         os.makedirs(self.img_dir, exist_ok=True)
+        # 证据存储：配额淘汰 / 近重复抑制 / 过期原图压缩为缩略图
+        self.evidence = EvidenceStore(self.img_dir, **(evidence_options or {}))
+        # 按需性能采样：看板按钮 / SIGUSR1 / 命令行触发，结果写入 output/profiles/
+        self.profiler = ProfilerCapture(os.path.join(self.output_dir, "profiles"), self.stage_timer)
+        # 交互热力图：手腕位置按小时 / 班次累加，导出到 output/heatmaps/
+        self.heatmap = InteractionHeatmap(os.path.join(self.output_dir, "heatmaps"), **(heatmap_options or {}))
+        # 滑动窗口 KPI (近 5 分钟 / 近 1 小时 / 本班次)，随 stats_signal 发出并定期写入 output/kpi_snapshot.json
+        self.kpi = KpiAggregator(os.path.join(self.output_dir, "kpi_snapshot.json"), **(kpi_options or {}))
 
         # 🔴 强制打印路径，让你一眼看到
         print(f"\n[SYSTEM] 证据保存路径已锁定: {self.output_dir}")
@@ -55,7 +92,7 @@ class AIWorker(QThread):
         if not os.path.exists(self.csv_path):
             with open(self.csv_path, 'w', newline='', encoding='utf-8-sig') as f:
                 writer = csv.writer(f)
-                writer.writerow(["时间", "事件类型", "当前计数", "图片文件名"])
+                writer.writerow(["时间", "事件类型", "当前计数", "图片文件名"])  # 文件名为相对 images/ 的路径
 
     def load_config(self):
         if os.path.exists(self.config_path):
@@ -80,21 +117,20 @@ class AIWorker(QThread):
         try:
             now = datetime.now()
             time_str = now.strftime("%Y-%m-%d %H:%M:%S")
-            file_time = now.strftime("%Y%m%d_%H%M%S")
-
-            img_name = f"{event_type}_{file_time}.jpg"
-            img_full_path = os.path.join(self.img_dir, img_name)
 
-            # 保存图片
-            cv2.imwrite(img_full_path, frame)
+            # 保存图片 (按日期分目录；与上一张同类型截图近乎相同时复用旧图，不重复落盘)
+            img_name, duplicate = self.evidence.save(frame, event_type, now)
 
             # 追加 CSV
             with open(self.csv_path, 'a', newline='', encoding='utf-8-sig') as f:
                 writer = csv.writer(f)
                 writer.writerow([time_str, event_type, count, img_name])
 
-            print(f"[SAVED] {img_full_path}")  # 控制台确认
-            self.log_signal.emit(f"💾 已抓拍: {img_name}")
+            if duplicate:
+                self.log_signal.emit(f"♻️ 画面与上一张相同，复用: {img_name}")
+            else:
+                print(f"[SAVED] {os.path.join(self.img_dir, img_name)}")  # 控制台确认
+                self.log_signal.emit(f"💾 已抓拍: {img_name}")
 
         except Exception as e:
             print(f"[ERROR] 保存失败: {e}")
@@ -108,6 +144,13 @@ class AIWorker(QThread):
             self.show_skeleton = value
         elif key == "angles":
             self.show_angles = value
+        elif key == "heatmap":
+            self.show_heatmap = value
+
+    @Slot(int)
+    def request_profile(self, frames):
+        self.profiler.request(frames)
+        self.log_signal.emit(f"🔬 性能采样: 接下来 {frames or self.profiler.default_frames} 帧")
 
     @Slot(str, list)
     def update_roi(self, side, points):
@@ -118,92 +161,167 @@ class AIWorker(QThread):
         self.save_config()
         self.log_signal.emit(f"✅ {side} ROI 更新")
 
-    def run(self):
-        if not os.path.exists(self.video_path): return
+    def publish_frame(self, canvas):
+        """把标注后的画面交给界面 (子进程模式下改为写入共享内存，见 src/ui/process_worker.py)"""
+        self.frame_signal.emit(self.frame_pool.next_image(lambda dst: cv2.cvtColor(canvas, cv2.COLOR_BGR2RGB, dst=dst)))
 
-        # 显卡选择
-        device = 'cuda' if torch.cuda.is_available() else 'cpu'
-        try:
-            detector = PoseDetector(self.model_path, device=device)
-            self.log_signal.emit(f"✅ 模型加载成功 ({device})")
-        except Exception as e:
-            self.log_signal.emit(f"❌ {e}")
+    def run(self):
+        is_stream = is_stream_url(self.video_path)
+        if not is_stream and not os.path.exists(self.video_path):
+            self.log_signal.emit(f"❌ 找不到视频: {self.video_path}")
+            self.finished_signal.emit()
             return
 
-        cap = cv2.VideoCapture(self.video_path)
-        video_fps = cap.get(cv2.CAP_PROP_FPS)
-        if video_fps <= 0: video_fps = 30
-        frame_interval = 1.0 / video_fps
+        # 本机标定的线程数 (check_env.py --calibrate)；torch 线程由 PoseDetector 加载时设置
+        profile = load_runtime_profile()
+        apply_thread_settings(profile, torch_threads=False)
+
+        detector = self.detector
+        if detector is None:
+            import torch
+
+            # 显卡选择
+            device = 'cuda' if torch.cuda.is_available() else 'cpu'
+            try:
+                fixed_input_ok = self.cascade_options is None and self.tile_options is None
+                detector = PoseDetector(resolve_model(self.model_path, profile, fixed_input_ok), device=device)
+                self.log_signal.emit(f"✅ 模型加载成功 ({device})")
+            except Exception as e:
+                self.log_signal.emit(f"❌ {e}")
+                self.finished_signal.emit()
+                return
+
+        tiled = None
+        tile_roi = False
+        cascade = None
+        if self.cascade_options is not None and self.tile_options is None:
+            if not hasattr(detector, "infer_batch"):
+                self.log_signal.emit("⚠️ 级联推理需要本地模型，推理服务模式下已忽略")
+            else:
+                options = dict(self.cascade_options)
+                stage1_model = options.pop("stage1_model", None)
+                if stage1_model:
+                    options["stage1"] = PoseDetector(stage1_model, device=detector.device,
+                                                     imgsz=options.get("stage1_imgsz", 320))
+                detector = cascade = CascadePoseDetector(detector, **options)
+                self.log_signal.emit(f"🪜 级联推理已开启 (第一级 {cascade.stage1_imgsz}px)")
+        elif self.cascade_options is not None:
+            self.log_signal.emit("⚠️ 已开启分块推理，级联推理被忽略")
+        if self.tile_options is not None:
+            tile_roi = self.tile_options.pop("roi_only", False)
+            detector = tiled = TiledPoseDetector(detector, **self.tile_options)
+            self.log_signal.emit(f"🧩 分块推理已开启 (图块 {tiled.tile}px{'，仅 ROI 区域' if tile_roi else ''})")
+
+        cap = None
+        stream = None
+        frame = None
+        frame_info = None
+        last_reconnects = 0
+        if is_stream:
+            # 视频流：独立线程只保留最新帧，处理跟不上时丢旧帧，不做节流
+            stream = LatestFrameGrabber(self.video_path, **self.stream_options).start()
+            frame_interval = 0
+        else:
+            cap = cv2.VideoCapture(self.video_path)
+            src_w, src_h = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            if src_w > 0 and src_h > 0:
+                self.frame_pool.ensure((src_h, src_w, 3))
+            video_fps = cap.get(cv2.CAP_PROP_FPS)
+            if video_fps <= 0: video_fps = 30
+            frame_interval = 1.0 / video_fps
+
+        recorder = None
+        if self.recorder_options is not None:
+            recorder = AsyncVideoRecorder(os.path.join(self.output_dir, "recordings"), **self.recorder_options)
+            self.log_signal.emit(f"⏺ 录像已开启 (output/recordings/)")
 
         self.log_signal.emit(f"🎥 监控已启动 (输出目录: output/)")
 
-        while self.running:
-            t_start = time.time()
-            ret, frame = cap.read()
-            if not ret:
-                cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-                continue
-
-            results, _ = detector.process_frame(frame)
-            canvas = frame.copy()
-            h, w = canvas.shape[:2]
-
-            # 坐标处理
-            cnt_left = None;
-            cnt_right = None
-            if len(self.roi_left) >= 3:
-                cnt_left = np.array([(int(nx * w), int(ny * h)) for (nx, ny) in self.roi_left], np.int32)
-            if len(self.roi_right) >= 3:
-                cnt_right = np.array([(int(nx * w), int(ny * h)) for (nx, ny) in self.roi_right], np.int32)
-
-            trigger_left = False;
-            trigger_right = False
-            current_worker_count = len(results.boxes) if results.boxes else 0
-
-            # 绘制与检测逻辑
-            if results.keypoints is not None:
-                for kps in results.keypoints.data:
-                    kps = kps.cpu().numpy()
-
-                    # 1. 伸手
+        profiler = self.profiler
+        service_failures = 0
+        try:
+            while self.running:
+                if profiler.requested or profiler.active:
+                    out = profiler.on_frame_boundary()
+                    if out:
+                        self.log_signal.emit(f"🔬 性能采样已保存: {os.path.relpath(out, self.project_root)}")
+                t_start = time.time()
+                timer = self.stage_timer
+                timer.start_frame()
+                if stream is not None:
+                    ret, frame, frame_info = stream.read(timeout=1.0)
+                    stream_stats = stream.stats()
+                    if stream_stats["reconnects"] != last_reconnects:
+                        last_reconnects = stream_stats["reconnects"]
+                        self.log_signal.emit(f"🔄 视频流已重连 (第 {last_reconnects} 次)")
+                    if not ret:
+                        continue
+                else:
+                    # 直接解码进池内缓冲 (首帧尺寸未知或分辨率变化时由 OpenCV 另行分配，池随之重建)
+                    ret, frame = cap.read(self.frame_pool.decode) if self.frame_pool.decode is not None else cap.read()
+                    if not ret:
+                        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                        continue
+                    frame = self.frame_pool.adopt_decoded(frame)
+
+                timer.mark("read")
+                h, w = frame.shape[:2]
+
+                # 坐标处理
+                cnt_left, cnt_right = roi_contours(self.roi_left, self.roi_right, w, h)
+                if tiled is not None and tile_roi:
+                    tiled.set_region_from_contours(cnt_left, cnt_right, frame.shape)
+                elif cascade is not None:
+                    cascade.set_zones(cnt_left, cnt_right, frame.shape)
+
+                # 精简推理：直接拿到 (N,17,3) 关键点与 (N,5) 检测框，不构建 Results 对象
+                try:
+                    all_kpts, boxes = detector.infer(frame)
+                except (OSError, http.client.HTTPException) as e:
+                    # 推理服务断开 / 超时 / 返回错误：指数退避后重试，服务恢复后继续
+                    delay = min(self.SERVICE_RETRY_MAX_SEC, 0.5 * 2 ** service_failures)
+                    service_failures += 1
+                    self.log_signal.emit(f"⚠️ 推理服务不可用 ({e.__class__.__name__}: {e})，{delay:.1f}s 后重试")
+                    self._sleep(delay)
+                    continue
+                if service_failures:
+                    self.log_signal.emit(f"✅ 推理服务已恢复 (重试 {service_failures} 次)")
+                    service_failures = 0
+                timer.mark("infer")
+                canvas = self.frame_pool.canvas_from(frame)
+                current_worker_count = len(boxes)
+
+                # 行为判定 (规则见 src/behavior.py)
+                analysis = analyze_frame(all_kpts, cnt_left, cnt_right)
+                trigger_left = analysis["trigger_left"]
+                trigger_right = analysis["trigger_right"]
+                self.heatmap.update(frame, all_kpts, analysis["persons"])
+
+                # 绘制逻辑
+                for kps, person in zip(all_kpts, analysis["persons"]):
                     left_wrist = (int(kps[9][0]), int(kps[9][1]))
                     right_wrist = (int(kps[10][0]), int(kps[10][1]))
-                    p_trigger_L = False;
-                    p_trigger_R = False
-
-                    if kps[9][2] > 0.5:
-                        if (cnt_left is not None and cv2.pointPolygonTest(cnt_left, left_wrist, False) > 0) or \
-                                (cnt_right is not None and cv2.pointPolygonTest(cnt_right, left_wrist, False) > 0):
-                            trigger_left = True;
-                            p_trigger_L = True
-                    if kps[10][2] > 0.5:
-                        if (cnt_left is not None and cv2.pointPolygonTest(cnt_left, right_wrist, False) > 0) or \
-                                (cnt_right is not None and cv2.pointPolygonTest(cnt_right, right_wrist, False) > 0):
-                            trigger_right = True;
-                            p_trigger_R = True
-
-                    # 2. 弯腰 (显示逻辑)
-                    if kps[6][2] > 0.5 and kps[12][2] > 0.5 and kps[14][2] > 0.5:
-                        angle = detector.calculate_angle(kps[6][:2], kps[12][:2], kps[14][:2])
-                        if angle < 140:
-                            cv2.putText(canvas, f"BEND {int(angle)}", (int(kps[12][0]), int(kps[12][1] - 20)),
-                                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-
-                    # 3. 高亮 (Reach)
+
+                    # 1. 弯腰
+                    if person["bend_angle"] is not None:
+                        cv2.putText(canvas, f"BEND {int(person['bend_angle'])}", (int(kps[12][0]), int(kps[12][1] - 20)),
+                                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+
+                    # 2. 高亮 (Reach)
                     color_core = (0, 255, 255);
                     color_glow = (255, 255, 0)
-                    if p_trigger_L and kps[7][2] > 0.5:
+                    if person["left_zone"] and kps[7][2] > 0.5:
                         cv2.line(canvas, left_wrist, (int(kps[7][0]), int(kps[7][1])), color_glow, 10)
                         cv2.line(canvas, left_wrist, (int(kps[7][0]), int(kps[7][1])), color_core, 4)
                         cv2.putText(canvas, "REACH", (left_wrist[0], left_wrist[1]), cv2.FONT_HERSHEY_SIMPLEX, 0.6,
                                     color_core, 2)
-                    if p_trigger_R and kps[8][2] > 0.5:
+                    if person["right_zone"] and kps[8][2] > 0.5:
                         cv2.line(canvas, right_wrist, (int(kps[8][0]), int(kps[8][1])), color_glow, 10)
                         cv2.line(canvas, right_wrist, (int(kps[8][0]), int(kps[8][1])), color_core, 4)
                         cv2.putText(canvas, "REACH", (right_wrist[0], right_wrist[1]), cv2.FONT_HERSHEY_SIMPLEX, 0.6,
                                     color_core, 2)
 
-                    # 4. 骨架
+                    # 3. 骨架
                     if self.show_skeleton:
                         for x, y, conf in kps:
                             if conf > 0.5: cv2.circle(canvas, (int(x), int(y)), 4, (0, 255, 0), -1)
@@ -214,59 +332,83 @@ class AIWorker(QThread):
                                 cv2.line(canvas, (int(kps[p1][0]), int(kps[p1][1])), (int(kps[p2][0]), int(kps[p2][1])),
                                          (255, 0, 255), 2)
 
-            # 状态机与保存
-            frame_has_reach = trigger_left or trigger_right
-            if frame_has_reach and not self.state_memory["is_reaching"]:
-                self.counters["reach"] += 1
-                self.log_signal.emit(f"⚠️ 伸手工作 +1")
-                self.save_evidence(canvas, "REACH", self.counters["reach"])  # 保存!
-                self.state_memory["is_reaching"] = True
-            elif not frame_has_reach:
-                self.state_memory["is_reaching"] = False
-
-            # 弯腰逻辑 (需要遍历所有人检查是否有弯腰，此处简化为只要画面有弯腰就触发)
-            # 在上面的循环里其实已经画了 BEND，这里做状态判定需要更严谨，
-            # 为简化代码，我们假设前面检测到 BEND 文字绘制就视作弯腰
-            # 但更严谨的是在循环里立 flag
-            any_bend = False
-            if results.keypoints is not None:
-                for kps in results.keypoints.data:
-                    kps = kps.cpu().numpy()
-                    if kps[6][2] > 0.5 and kps[12][2] > 0.5 and kps[14][2] > 0.5:
-                        if detector.calculate_angle(kps[6][:2], kps[12][:2], kps[14][:2]) < 140:
-                            any_bend = True
-                            break
-
-            if any_bend and not self.state_memory["is_bending"]:
-                self.counters["bend"] += 1
-                self.log_signal.emit(f"⚠️ 弯腰工作 +1")
-                self.save_evidence(canvas, "BEND", self.counters["bend"])  # 保存!
-                self.state_memory["is_bending"] = True
-            elif not any_bend:
-                self.state_memory["is_bending"] = False
-
-            # ROI 绘制
-            if self.show_roi:
-                if cnt_left is not None:
-                    cv2.polylines(canvas, [cnt_left], True, (0, 0, 255) if trigger_left else (0, 255, 255), 2)
-                    cv2.putText(canvas, "LEFT", tuple(cnt_left[0]), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
-                if cnt_right is not None:
-                    cv2.polylines(canvas, [cnt_right], True, (0, 0, 255) if trigger_right else (0, 255, 255), 2)
-                    cv2.putText(canvas, "RIGHT", tuple(cnt_right[0]), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
-
-            rgb = cv2.cvtColor(canvas, cv2.COLOR_BGR2RGB)
-            qt_img = QImage(rgb.data, w, h, w * 3, QImage.Format_RGB888).copy()
-            self.frame_signal.emit(qt_img)
-            self.stats_signal.emit({"worker_count": current_worker_count, "reach_count": self.counters["reach"],
-                                    "bend_count": self.counters["bend"]})
-
-            t_end = time.time()
-            if (t_end - t_start) < frame_interval: time.sleep(frame_interval - (t_end - t_start))
-
-        cap.release()
+                # 状态机与保存 (上升沿计数)
+                new_events = self.event_state.update(trigger_left or trigger_right, analysis["any_bend"])
+                for event_type in new_events:
+                    key = event_type.lower()
+                    self.counters[key] += 1
+                    self.log_signal.emit(f"⚠️ {'伸手' if event_type == 'REACH' else '弯腰'}工作 +1")
+                    self.save_evidence(canvas, event_type, self.counters[key])  # 保存!
+
+                # trigger_left / right 是按手腕 (左手 / 右手) 区分的，区域占用要看手腕落在哪个货架
+                persons = analysis["persons"]
+                self.kpi.update(t_start, current_worker_count, sum(p["bend_angle"] is not None for p in persons),
+                                tuple(any(zone in (p["left_zone"], p["right_zone"]) for p in persons)
+                                      for zone in ("left", "right")),
+                                new_events)
+
+                # ROI 绘制
+                if self.show_roi:
+                    if cnt_left is not None:
+                        cv2.polylines(canvas, [cnt_left], True, (0, 0, 255) if trigger_left else (0, 255, 255), 2)
+                        cv2.putText(canvas, "LEFT", tuple(cnt_left[0]), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
+                    if cnt_right is not None:
+                        cv2.polylines(canvas, [cnt_right], True, (0, 0, 255) if trigger_right else (0, 255, 255), 2)
+                        cv2.putText(canvas, "RIGHT", tuple(cnt_right[0]), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
+
+                if self.show_heatmap:
+                    self.heatmap.render(canvas, t_start)
+
+                timer.mark("analyze")
+                if recorder is not None:
+                    recorder.submit(canvas)  # 非阻塞：槽位用尽时丢帧计数
+
+                self.publish_frame(canvas)
+                stats = {"worker_count": current_worker_count, "reach_count": self.counters["reach"],
+                         "bend_count": self.counters["bend"]}
+                if stream is not None:
+                    # 端到端延迟：帧到达 -> 结果发出
+                    stream_stats["latency_ms"] = int((time.time() - frame_info["recv_ts"]) * 1000)
+                    stats["stream"] = stream_stats
+                if recorder is not None:
+                    stats["recording"] = recorder.stats()
+                stats["evidence"] = self.evidence.stats()
+                stats["frame_pool"] = self.frame_pool.stats()
+                stats["heatmap"] = self.heatmap.stats()
+                stats["kpi"] = self.kpi.snapshot()
+                if cascade is not None:
+                    stats["cascade"] = cascade.stats()
+                self.stats_signal.emit(stats)
+                timer.mark("publish")
+                timer.end_frame()
+
+                t_end = time.time()
+                if self.realtime and (t_end - t_start) < frame_interval: time.sleep(frame_interval - (t_end - t_start))
+        except Exception as e:
+            # 未预料的异常：记录后照常收尾 (停止录像 / 导出热力图 / 通知界面)，不让线程无声退出
+            traceback.print_exc()
+            self.log_signal.emit(f"❌ 分析线程异常退出: {e}")
+
+        out = profiler.finish()  # 停止时仍在采样：输出已采集的部分
+        if out:
+            self.log_signal.emit(f"🔬 性能采样已保存: {os.path.relpath(out, self.project_root)}")
+        self.heatmap.export(frame)  # 停止时导出当前小时 / 班次，以最后一帧作底图
+        self.kpi.write_snapshot()
+        if stream is not None:
+            stream.stop()
+        if recorder is not None:
+            recorder.stop()
+        if cap is not None:
+            cap.release()
         self.log_signal.emit("⏹ 停止")
         self.finished_signal.emit()
 
+    def _sleep(self, seconds):
+        """可被 stop() 打断的等待"""
+        deadline = time.time() + seconds
+        while self.running and time.time() < deadline:
+            time.sleep(min(0.1, deadline - time.time()))
+
     def stop(self):
         self.running = False
         self.wait()
\ No newline at end of file
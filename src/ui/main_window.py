@@ -1,7 +1,11 @@
 import sys
 import os
 import time
-from collections import deque  # 用于存储最近 N 帧的数据
+import signal
+import argparse
+
+# 进程启动时刻，用于统计冷启动耗时
+APP_START = time.perf_counter()
 
 # 路径自适应
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -14,78 +18,20 @@ from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                                QTextEdit, QGridLayout, QCheckBox, QSizePolicy)
 from PySide6.QtCore import Qt, Slot, Signal, QEvent, QPoint, QTimer
 from PySide6.QtGui import QFont, QPixmap, QImage, QCursor
-from src.ui.ai_worker import AIWorker
-
-# --- 📊 引入 Matplotlib ---
-import matplotlib
-
-matplotlib.use('QtAgg')  # 告诉 Matplotlib 使用 Qt 后端
-from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-import matplotlib.pyplot as plt
-
-# 设置 Matplotlib 的全局样式 (暗黑风格)
-plt.style.use('dark_background')
-
-
-class RealTimeChart(FigureCanvas):
-    """自定义的动态图表组件"""
-
-    def __init__(self, parent=None, width=5, height=2, dpi=100):
-        # 创建画布，背景色设为深灰，去掉边框
-        self.fig = Figure(figsize=(width, height), dpi=dpi, facecolor='#1e1e1e')
-        self.ax = self.fig.add_subplot(111)
-        self.ax.set_facecolor('#1e1e1e')  # 坐标轴背景
-
-        super().__init__(self.fig)
-        self.setParent(parent)
-
-        # 数据容器 (只保留最近 50 个点)
-        self.max_len = 50
-        self.data_reach = deque([0] * self.max_len, maxlen=self.max_len)
-        self.data_bend = deque([0] * self.max_len, maxlen=self.max_len)
-
-        # 初始化两条曲线
-        # 黄线: 伸手, 红线: 弯腰
-        self.line_reach, = self.ax.plot([], [], 'o-', color='#ffaa00', linewidth=2, markersize=4, label='Reach')
-        self.line_bend, = self.ax.plot([], [], 'o-', color='#ff5555', linewidth=2, markersize=4, label='Bend')
-
-        # 设置坐标轴样式 (去刻度，留网格)
-        self.ax.grid(True, color='#333333', linestyle='--')
-        self.ax.spines['top'].set_visible(False)
-        self.ax.spines['right'].set_visible(False)
-        self.ax.spines['bottom'].set_color('#444')
-        self.ax.spines['left'].set_color('#444')
-        self.ax.tick_params(colors='#888')
-
-        # 设置Y轴范围 (自动适应或固定)
-        self.ax.set_ylim(-0.5, 5)
-        self.ax.legend(loc='upper left', facecolor='#1e1e1e', edgecolor='#333', labelcolor='#ccc', fontsize=8)
+from src.ui.startup import BackgroundLoader
 
-    def update_chart(self, new_reach, new_bend):
-        """更新数据并重绘"""
-        self.data_reach.append(new_reach)
-        self.data_bend.append(new_bend)
-
-        x_data = range(len(self.data_reach))
-
-        self.line_reach.set_data(x_data, self.data_reach)
-        self.line_bend.set_data(x_data, self.data_bend)
-
-        # 动态调整 Y 轴 (如果数值超过当前范围)
-        max_val = max(max(self.data_reach), max(self.data_bend))
-        if max_val > self.ax.get_ylim()[1]:
-            self.ax.set_ylim(-0.5, max_val + 2)
-
-        self.draw()  # 重绘
+# 注意：AIWorker (torch / ultralytics / cv2) 与 Matplotlib 图表均为延迟加载，
+# 窗口先显示，重量级依赖由 BackgroundLoader 在后台线程中完成导入与模型加载
 
 
 class MainWindow(QMainWindow):
     settings_changed = Signal(str, bool)
     roi_updated = Signal(str, list)
+    profile_requested = Signal(int)
 
-    def __init__(self):
+    def __init__(self, args=None):
         super().__init__()
+        self.args = args if args is not None else parse_args([])
         self.setWindowTitle("智能仓储行为分析系统 v4.0 (数据可视化版)")
         self.resize(1450, 900)
         self.setStyleSheet("""
@@ -122,9 +68,15 @@ class MainWindow(QMainWindow):
         content.setLayout(self.content_layout)
         self.root_layout.addWidget(content)
 
+        root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.model_path = os.path.join(root_dir, "models", "yolo11n-pose.pt")
+        self.video_path = self.args.source or os.path.join(root_dir, "data", "video_1.mp4")
+
         self.init_video_area()
         self.init_dashboard_area()
         self.worker = None
+        self.worker_cls = None  # 由后台加载线程注入
+        self.detector = None
         self.drawing_target = None
         self.temp_points = []
 
@@ -132,6 +84,19 @@ class MainWindow(QMainWindow):
         self.last_reach = 0
         self.last_bend = 0
 
+        # 后台初始化：导入推理依赖 + 加载模型
+        self.start_loader()
+
+    def start_loader(self):
+        """启动后台加载线程 (启动时，以及推理服务连接失败后点击重连时)"""
+        self.loader = BackgroundLoader(self.model_path, server_url=self.args.server, process_mode=self.args.process,
+                                       fixed_input_ok=not (self.args.cascade or self.args.tile))
+        self.loader.progress_signal.connect(self.update_loading)
+        self.loader.module_signal.connect(self.on_module_loaded)
+        self.loader.loaded_signal.connect(self.on_loaded)
+        self.loader.failed_signal.connect(self.on_load_failed)
+        self.loader.start()
+
     def init_video_area(self):
         video_frame = QFrame(objectName="Card")
         layout = QVBoxLayout()
@@ -165,6 +130,14 @@ class MainWindow(QMainWindow):
         self.lbl_status.setStyleSheet(
             "color: #aaa; background-color: #333; border-radius: 14px; padding: 6px 12px; font-weight: bold;")
         s_layout.addWidget(self.lbl_status)
+        self.lbl_stream = QLabel("")  # 视频流状态 (仅视频流模式显示)
+        self.lbl_stream.setStyleSheet("color: #888; font-size: 12px;")
+        self.lbl_stream.setVisible(False)
+        s_layout.addWidget(self.lbl_stream)
+        self.lbl_record = QLabel("")  # 录像状态 (仅开启录像时显示)
+        self.lbl_record.setStyleSheet("color: #888; font-size: 12px;")
+        self.lbl_record.setVisible(False)
+        s_layout.addWidget(self.lbl_record)
         layout.addWidget(status_card)
 
         # 2. 统计
@@ -185,6 +158,10 @@ class MainWindow(QMainWindow):
         grid.addWidget(QLabel("弯腰工作"), 2, 0);
         grid.addWidget(self.lbl_bend, 2, 1, alignment=Qt.AlignRight)
         d_layout.addLayout(grid)
+        self.lbl_kpi = QLabel("")  # 滑动窗口 KPI (近 5 分钟 / 近 1 小时 / 本班次)
+        self.lbl_kpi.setStyleSheet("color: #888; font-size: 12px;")
+        self.lbl_kpi.setVisible(False)
+        d_layout.addWidget(self.lbl_kpi)
         layout.addWidget(data_card)
 
         # 3. 🟢 新增：趋势图表
@@ -193,9 +170,13 @@ class MainWindow(QMainWindow):
         chart_card.setLayout(c_layout)
         c_layout.addWidget(QLabel("作业趋势 (TRENDS)", objectName="CardTitle"))
 
-        # 实例化图表组件
-        self.chart = RealTimeChart(width=5, height=3)  # 高度设为3英寸
-        c_layout.addWidget(self.chart)
+        # 图表组件延迟创建：Matplotlib 在后台线程导入完成后再实例化
+        self.chart = None
+        self.chart_layout = c_layout
+        self.chart_placeholder = QLabel("图表加载中...")
+        self.chart_placeholder.setAlignment(Qt.AlignCenter)
+        self.chart_placeholder.setMinimumHeight(300)
+        c_layout.addWidget(self.chart_placeholder)
 
         layout.addWidget(chart_card)
 
@@ -223,14 +204,18 @@ class MainWindow(QMainWindow):
         self.cb_skel.setChecked(True)
         self.cb_angle = QCheckBox("显示关节角度");
         self.cb_angle.setChecked(False)
+        self.cb_heat = QCheckBox("显示交互热力图 (本班次)");
+        self.cb_heat.setChecked(False)
 
         self.cb_roi.toggled.connect(lambda v: self.send_settings("roi", v))
         self.cb_skel.toggled.connect(lambda v: self.send_settings("skeleton", v))
         self.cb_angle.toggled.connect(lambda v: self.send_settings("angles", v))
+        self.cb_heat.toggled.connect(lambda v: self.send_settings("heatmap", v))
 
         v_layout.addWidget(self.cb_roi);
         v_layout.addWidget(self.cb_skel);
-        v_layout.addWidget(self.cb_angle)
+        v_layout.addWidget(self.cb_angle);
+        v_layout.addWidget(self.cb_heat)
         layout.addWidget(viz_card)
 
         # 5. 日志与按钮
@@ -243,9 +228,16 @@ class MainWindow(QMainWindow):
         l_layout.addWidget(self.log_area)
         layout.addWidget(log_card, stretch=1)
 
+        self.btn_profile = QPushButton("🔬 性能采样")
+        self.btn_profile.setToolTip("采集接下来若干帧的 cProfile / 调用栈 / 算子 / 阶段时间线，写入 output/profiles/")
+        self.btn_profile.setEnabled(False)
+        self.btn_profile.clicked.connect(self.request_profile)
+        l_layout.addWidget(self.btn_profile)
+
         btn_layout = QHBoxLayout()
-        self.btn_start = QPushButton("▶ 启动", objectName="ActionBtn")
+        self.btn_start = QPushButton("⏳ 加载中...", objectName="ActionBtn")
         self.btn_start.setMinimumHeight(50)
+        self.btn_start.setEnabled(False)  # 模型就绪后再开放
         self.btn_start.clicked.connect(self.start_analysis)
         self.btn_stop = QPushButton("⏹ 停止", objectName="StopBtn")
         self.btn_stop.setMinimumHeight(50)
@@ -257,6 +249,62 @@ class MainWindow(QMainWindow):
 
         self.content_layout.addWidget(right_panel, stretch=25)
 
+    @Slot(str)
+    def on_module_loaded(self, module_name):
+        if module_name == "src.ui.realtime_chart" and self.chart is None:
+            self.init_chart()
+
+    def init_chart(self):
+        from src.ui.realtime_chart import RealTimeChart
+
+        # 实例化图表组件
+        self.chart = RealTimeChart(width=5, height=3)  # 高度设为3英寸
+        self.chart_layout.replaceWidget(self.chart_placeholder, self.chart)
+        self.chart_placeholder.deleteLater()
+
+    @Slot(str, int)
+    def update_loading(self, stage, percent):
+        self.lbl_status.setText(f" ● {stage} {percent}% ")
+        self.lbl_status.setStyleSheet(
+            "color: #fff; background-color: #b8860b; border-radius: 14px; padding: 6px 12px; font-weight: bold;")
+
+    @Slot(object)
+    def on_loaded(self, result):
+        self.worker_cls = result["worker_cls"]
+        self.detector = result["detector"]
+        self.btn_start.setText("▶ 启动")
+        self.btn_start.setEnabled(True)
+        self.lbl_status.setText(" ● 就绪 ")
+        self.lbl_status.setStyleSheet(
+            "color: #aaa; background-color: #333; border-radius: 14px; padding: 6px 12px; font-weight: bold;")
+
+        # 启动耗时明细
+        detail = " | ".join(f"{k} {v:.2f}s" for k, v in self.loader.timings.items())
+        if self.args.process and not self.args.server:
+            self.log_area.append("✅ 界面就绪 (模型将在分析子进程中加载)")
+        else:
+            self.log_area.append(f"✅ 模型加载成功 ({result['device']})")
+        self.log_area.append(f"⏱ 后台初始化: {detail}")
+        self.log_area.append(f"⏱ 启动至可用: {time.perf_counter() - APP_START:.2f}s")
+
+    @Slot(str)
+    def on_load_failed(self, error):
+        self.lbl_status.setText(" ● 加载失败 ")
+        self.lbl_status.setStyleSheet(
+            "color: #fff; background-color: #d9534f; border-radius: 14px; padding: 6px 12px; font-weight: bold;")
+        self.log_area.append(f"❌ {error}")
+        self.btn_start.setEnabled(True)
+        if self.args.server:
+            # 指定了推理服务时不回退到本地模型 (本机可能没有 GPU / 权重)，由用户确认服务恢复后重连
+            self.btn_start.setText("↻ 重连服务")
+            self.log_area.append(f"↩️ 推理服务 {self.args.server} 不可用，恢复后点击「重连服务」")
+            return
+        self.btn_start.setText("▶ 启动")
+        # 退回到加载前的做法：启动分析时由工作线程自行导入依赖并加载模型，不必重启程序
+        self.worker_cls = None
+        self.detector = None
+        self.log_area.append("↩️ 可直接启动，模型将在分析线程中重新加载")
+
     def start_drawing(self, target):
         if not self.worker:
             self.log_area.append("❌ 请先启动分析再绘制！")
@@ -293,6 +341,12 @@ class MainWindow(QMainWindow):
         self.settings_changed.emit(key, value)
 
     def start_analysis(self):
+        if self.args.server and self.detector is None:
+            # 推理服务连接失败后的重连：重建 PoseClient，成功后再启动
+            self.btn_start.setEnabled(False)
+            self.btn_start.setText("⏳ 连接中...")
+            self.start_loader()
+            return
         self.log_area.append(">>> 初始化...")
         self.btn_start.setEnabled(False);
         self.btn_stop.setEnabled(True)
@@ -303,33 +357,80 @@ class MainWindow(QMainWindow):
         # 重置图表计数器
         self.last_reach = 0
         self.last_bend = 0
-        self.chart.data_reach.clear()
-        self.chart.data_bend.clear()
-
-        root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        model = os.path.join(root_dir, "models", "yolo11n-pose.pt")
-        video = os.path.join(root_dir, "data", "video_1.mp4")
-
-        self.worker = AIWorker(model, video)
+        if self.chart:
+            self.chart.data_reach.clear()
+            self.chart.data_bend.clear()
+
+        stream_options = {"reconnect_max": self.args.reconnect_max, "stale_after": self.args.stale_after}
+        recorder_options = None
+        if self.args.record:
+            recorder_options = {"fps": self.args.record_fps, "width": self.args.record_width,
+                                "segment_sec": self.args.segment_min * 60, "segment_mb": self.args.segment_mb}
+        evidence_options = {"quota_mb": self.args.evidence_quota_mb, "full_res_hours": self.args.evidence_full_hours,
+                            "dedup_distance": self.args.dedup_distance}
+        tile_options = None
+        if self.args.tile:
+            tile_options = {"tile": self.args.tile, "overlap": self.args.tile_overlap, "roi_only": self.args.tile_roi,
+                            "latency_budget_ms": self.args.tile_budget_ms}
+        cascade_options = None
+        if self.args.cascade:
+            cascade_options = {"stage1_imgsz": self.args.cascade_imgsz, "approach_margin": self.args.cascade_margin,
+                               "stage1_model": self.args.cascade_model, "crop_size": self.args.cascade_crop or None}
+        heatmap_options = {"cell": self.args.heatmap_cell, "shift_hours": self.args.shift_hours,
+                           "first_shift_hour": self.args.shift_start}
+        kpi_options = {"shift_hours": self.args.shift_hours, "first_shift_hour": self.args.shift_start,
+                       "snapshot_interval_sec": self.args.kpi_interval}
+        if self.worker_cls is None:  # 后台加载失败后的回退路径
+            if self.args.process:
+                from src.ui.process_worker import ProcessWorker as worker_cls
+            else:
+                from src.ui.ai_worker import AIWorker as worker_cls
+            self.worker_cls = worker_cls
+        self.worker = self.worker_cls(self.model_path, self.video_path, detector=self.detector,
+                                      stream_options=stream_options, recorder_options=recorder_options,
+                                      evidence_options=evidence_options, heatmap_options=heatmap_options,
+                                      tile_options=tile_options, cascade_options=cascade_options,
+                                      kpi_options=kpi_options)
         self.worker.frame_signal.connect(self.update_image)
         self.worker.stats_signal.connect(self.update_stats)
         self.worker.log_signal.connect(self.update_log)
+        self.worker.finished_signal.connect(self.on_worker_finished)
         self.settings_changed.connect(self.worker.update_settings)
         self.roi_updated.connect(self.worker.update_roi)
+        self.profile_requested.connect(self.worker.request_profile)
 
         self.send_settings("roi", self.cb_roi.isChecked())
         self.send_settings("skeleton", self.cb_skel.isChecked())
         self.send_settings("angles", self.cb_angle.isChecked())
+        self.send_settings("heatmap", self.cb_heat.isChecked())
+        if self.args.profile_on_start:
+            self.request_profile()
         self.worker.start()
+        self.btn_profile.setEnabled(True)
+
+    def request_profile(self):
+        """看板按钮 / SIGUSR1 / --profile-on-start 共用的入口"""
+        if self.worker:
+            self.profile_requested.emit(self.args.profile_frames)
+
+    @Slot()
+    def on_worker_finished(self):
+        """工作线程自行结束 (找不到视频 / 模型加载失败 / 异常退出) 时恢复界面；手动停止时 worker 已置空"""
+        if self.worker is not None and self.sender() is self.worker:
+            self.stop_analysis()
 
     def stop_analysis(self):
         if self.worker: self.worker.stop(); self.worker = None
+        self.btn_profile.setEnabled(False)
         self.btn_start.setEnabled(True);
         self.btn_stop.setEnabled(False)
         self.lbl_status.setText(" ● 就绪 ");
         self.lbl_status.setStyleSheet(
             "color: #aaa; background-color: #333; border-radius: 14px; padding: 6px 12px; font-weight: bold;")
         self.lbl_video.clear()
+        self.lbl_stream.setVisible(False)
+        self.lbl_record.setVisible(False)
+        self.lbl_kpi.setVisible(False)
 
     @Slot(QImage)
     def update_image(self, image):
@@ -345,10 +446,34 @@ class MainWindow(QMainWindow):
         self.lbl_reach.setText(str(r))
         self.lbl_bend.setText(str(b))
 
+        stream = data.get("stream")
+        if stream is not None:
+            state = "在线" if stream["connected"] else "重连中"
+            self.lbl_stream.setText(f"视频流{state} | 延迟 {stream['latency_ms']} ms | "
+                                    f"丢帧 {stream['dropped']} | 过期 {stream['stale']} | 重连 {stream['reconnects']}")
+            self.lbl_stream.setVisible(True)
+
+        kpi = data.get("kpi")
+        if kpi is not None:
+            lines = []
+            for name, title in (("5min", "近5分钟"), ("1h", "近1小时"), ("shift", "本班次")):
+                k = kpi[name]
+                z = k["zones"]
+                lines.append(f"{title}: {k['events_per_worker_hour']:.1f} 次/工时 | 弯腰 {k['bend_share']:.0%} | "
+                             f"伸手 左 {z['left']['reach_per_worker_hour']:.1f} 右 {z['right']['reach_per_worker_hour']:.1f}")
+            self.lbl_kpi.setText("\n".join(lines))
+            self.lbl_kpi.setVisible(True)
+
+        rec = data.get("recording")
+        if rec is not None:
+            self.lbl_record.setText(f"⏺ 录像 {rec['segment']} | 已写 {rec['written']} | 丢帧 {rec['dropped']}")
+            self.lbl_record.setVisible(True)
+
         # 🟢 图表更新逻辑：我们不画总数，而是画“当前这一刻是否发生了动作”
         # 或者画总数的增长趋势。为了好看，我们画“总数”。
         # 每隔几帧刷新一次图表，否则太费资源
-        self.chart.update_chart(r, b)
+        if self.chart:
+            self.chart.update_chart(r, b)
 
     @Slot(str)
     def update_log(self, text):
@@ -359,8 +484,55 @@ class MainWindow(QMainWindow):
         event.accept()
 
 
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="智能仓储行为分析系统")
+    p.add_argument("--server", default=None,
+                   help="使用本地推理服务代替进程内模型，如 http://127.0.0.1:8765 或 unix:///tmp/pose.sock")
+    p.add_argument("--process", action="store_true",
+                   help="分析流程在独立子进程中运行，标注画面经共享内存传回界面 (模型在子进程中加载)")
+    p.add_argument("--source", default=None,
+                   help="视频源：本地文件 (默认 data/video_1.mp4，循环播放) 或 rtsp:// / http:// 视频流")
+    p.add_argument("--reconnect-max", type=float, default=10.0, help="视频流断线重连的最大退避间隔 (秒)")
+    p.add_argument("--stale-after", type=float, default=1.0, help="帧到达后超过该秒数才被处理即计为过期帧")
+    p.add_argument("--record", action="store_true", help="录制标注后的画面到 output/recordings/ (后台编码)")
+    p.add_argument("--record-fps", type=float, default=10.0, help="录像帧率 (抽帧)")
+    p.add_argument("--record-width", type=int, default=1280, help="录像宽度，高度按比例缩放 (0 = 原分辨率)")
+    p.add_argument("--segment-min", type=float, default=10.0, help="按时长分段 (分钟，0 = 不分段)")
+    p.add_argument("--segment-mb", type=float, default=0.0, help="按文件大小分段 (MB，0 = 不限制)")
+    p.add_argument("--evidence-quota-mb", type=float, default=2048.0, help="证据截图磁盘配额 (MB，0 = 不限制)")
+    p.add_argument("--evidence-full-hours", type=float, default=24.0, help="原图保留时长，更早的压缩为缩略图 (小时)")
+    p.add_argument("--dedup-distance", type=int, default=6, help="近重复判定的感知哈希距离 (-1 = 关闭去重)")
+    p.add_argument("--tile", type=int, default=0, help="高分辨率分块推理的图块边长 (原图像素，0 = 关闭)")
+    p.add_argument("--tile-overlap", type=float, default=0.2, help="相邻图块重叠比例")
+    p.add_argument("--tile-roi", action="store_true", help="只对 ROI 外扩区域分块 (其余区域由整帧推理覆盖)")
+    p.add_argument("--tile-budget-ms", type=float, default=0.0, help="单批推理耗时预算，据此选择批大小 (0 = 不限)")
+    p.add_argument("--cascade", action="store_true",
+                   help="两级级联：每帧先低分辨率找人，只对靠近货架区域的人做全分辨率姿态推理")
+    p.add_argument("--cascade-imgsz", type=int, default=320, help="第一级输入尺寸")
+    p.add_argument("--cascade-margin", type=int, default=40, help="货架区域向外扩展的像素数 (靠近即进入第二级)")
+    p.add_argument("--cascade-model", default=None, help="第一级使用的单独姿态权重 (默认复用主模型)")
+    p.add_argument("--cascade-crop", type=int, default=0,
+                   help="第二级图块边长上限 (0 = 模型输入尺寸；小图块按原始尺寸推理)")
+    p.add_argument("--profile-frames", type=int, default=100, help="每次性能采样的帧数 (按钮 / SIGUSR1 触发)")
+    p.add_argument("--profile-on-start", action="store_true", help="启动分析后立即采样一次")
+    p.add_argument("--heatmap-cell", type=int, default=16, help="热力图网格边长 (像素)")
+    p.add_argument("--shift-hours", type=float, default=8.0, help="班次时长 (小时)，热力图按班次滚动")
+    p.add_argument("--shift-start", type=int, default=6, help="每天第一个班次的开始时刻 (点)")
+    p.add_argument("--kpi-interval", type=float, default=30.0,
+                   help="KPI 快照写入 output/kpi_snapshot.json 的间隔 (秒，0 = 只在停止时写入)")
+    return p.parse_args(argv)
+
+
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    window = MainWindow()
+    args = parse_args()
+    app = QApplication(sys.argv[:1])
+    window = MainWindow(args)
     window.show()
+    if hasattr(signal, "SIGUSR1"):
+        # kill -USR1 <pid> 触发一次性能采样；Qt 事件循环期间 Python 处理不到信号，用空定时器定期让出解释器
+        signal.signal(signal.SIGUSR1, lambda *_: window.request_profile())
+        signal_timer = QTimer()
+        signal_timer.timeout.connect(lambda: None)
+        signal_timer.start(250)
+    print(f"[Startup] 窗口已显示: {time.perf_counter() - APP_START:.2f}s")
     sys.exit(app.exec())
\ No newline at end of file
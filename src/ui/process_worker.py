@@ -0,0 +1,185 @@
+"""
+子进程模式的推理工作者
+整条分析流程 (读帧 / 推理 / 判定 / 绘制 / 录像) 在独立子进程中运行，不再与界面争用同一个解释器；
+标注画面经共享内存三缓冲帧环 (src/shared_frames.py) 传回，界面直接把最新槽位包装成 QImage，不复制像素。
+统计、日志与控制命令 (ROI 更新 / 显示开关 / 性能采样 / 停止) 走两条 multiprocessing 队列。
+ProcessWorker 与 AIWorker 的信号 / 槽 / start / stop 接口一致，主界面无需区分。
+"""
+import multiprocessing as mp
+import queue
+import sys
+import threading
+
+import cv2
+from PySide6.QtCore import QThread, Signal, Slot
+from PySide6.QtGui import QImage
+
+from src.shared_frames import FRESH, FrameRingReader, FrameRingWriter, make_control
+from src.ui.ai_worker import AIWorker
+
+
+class SharedFrameWorker(AIWorker):
+    """子进程内的 AIWorker：画面写入共享内存帧环而不是构造 QImage"""
+
+    def __init__(self, *args, ring=None, messages=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.ring = ring
+        self.messages = messages
+
+    def publish_frame(self, canvas):
+        h, w = canvas.shape[:2]
+        cv2.cvtColor(canvas, cv2.COLOR_BGR2RGB, dst=self.ring.buffer(h, w))
+        if self.ring.commit():
+            self.messages.put(("frame",))
+
+
+def _child_main(model_path, video_path, server_url, worker_options, control, commands, messages, stats_pending):
+    """子进程入口 (spawn 启动，只能使用可 pickle 的参数)"""
+    from PySide6.QtCore import QCoreApplication
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])  # noqa: F841 (Qt 信号需要 app)
+    detector = None
+    if server_url:
+        from src.inference_client import PoseClient
+        detector = PoseClient(server_url)
+
+    ring = FrameRingWriter(control, lambda gen, names, shape: messages.put(("ring", gen, names, shape)))
+    worker = SharedFrameWorker(model_path, video_path, detector=detector, ring=ring, messages=messages,
+                               **worker_options)
+
+    def send_stats(stats):
+        # 界面还没取走上一份统计时丢弃本帧的 (下一帧会带来更新的)，队列里最多积压一份
+        if not stats_pending.is_set():
+            stats_pending.set()
+            messages.put(("stats", stats))
+
+    worker.stats_signal.connect(send_stats)
+    worker.log_signal.connect(lambda text: messages.put(("log", text)))
+
+    def pump_commands():
+        while True:
+            cmd = commands.get()
+            if cmd[0] == "stop":
+                worker.running = False
+                return
+            if cmd[0] == "settings":
+                worker.update_settings(cmd[1], cmd[2])
+            elif cmd[0] == "roi":
+                worker.update_roi(cmd[1], cmd[2])
+            elif cmd[0] == "profile":
+                worker.request_profile(cmd[1])
+
+    threading.Thread(target=pump_commands, name="worker-commands", daemon=True).start()
+    try:
+        worker.run()  # 在本进程主线程上运行，直到收到 stop
+    finally:
+        ring.close()
+        messages.put(("finished",))
+
+
+class ProcessWorker(QThread):
+    """
+    主进程侧代理：启动子进程，并在本线程中转发子进程发来的消息
+    画面通知经 _frame_ready 排队到界面线程，由界面线程取帧并同步发出 frame_signal，
+    因此被包装的槽位在界面绘制完成之前不会被归还给写端。
+    """
+    frame_signal = Signal(QImage)
+    stats_signal = Signal(dict)
+    log_signal = Signal(str)
+    finished_signal = Signal()
+    _frame_ready = Signal()
+    _ring_ready = Signal(int, list, tuple)
+
+    def __init__(self, model_path, video_path, detector=None, **worker_options):
+        """
+        detector:       可传入 PoseClient，子进程改为连接同一推理服务；本地模型在子进程中加载
+        worker_options: 原样传给子进程中的 AIWorker (stream_options / recorder_options ...)
+        """
+        super().__init__()
+        self.model_path = model_path
+        self.video_path = video_path
+        self.server_url = getattr(detector, "url", None)
+        self.worker_options = worker_options
+        # Qt 与 fork 不兼容，统一用 spawn
+        self.ctx = mp.get_context("spawn")
+        self.control = make_control(self.ctx)
+        self.commands = self.ctx.Queue()
+        self.messages = self.ctx.Queue()
+        self.stats_pending = self.ctx.Event()
+        self.reader = FrameRingReader(self.control)
+        self.process = None
+        self.frame_image = None  # 当前包装共享内存的 QImage (持有引用直到下一帧)
+
+        self._frame_ready.connect(self._on_frame_ready)
+        self._ring_ready.connect(self._on_ring_ready)
+
+    def start(self):
+        self.process = self.ctx.Process(
+            target=_child_main, name="pose-worker", daemon=True,
+            args=(self.model_path, self.video_path, self.server_url, self.worker_options,
+                  self.control, self.commands, self.messages, self.stats_pending))
+        self.process.start()
+        super().start()
+
+    def run(self):
+        """消息泵：子进程退出且队列取空后结束"""
+        while True:
+            try:
+                msg = self.messages.get(timeout=0.2)
+            except queue.Empty:
+                if not self.process.is_alive():
+                    break
+                if self.control[FRESH]:
+                    self._frame_ready.emit()  # 兜底：有未取的帧但通知已丢失 (如帧环重建期间)
+                continue
+            kind = msg[0]
+            if kind == "frame":
+                self._frame_ready.emit()
+            elif kind == "stats":
+                self.stats_pending.clear()
+                self.stats_signal.emit(msg[1])
+            elif kind == "log":
+                self.log_signal.emit(msg[1])
+            elif kind == "ring":
+                self._ring_ready.emit(msg[1], msg[2], tuple(msg[3]))
+            elif kind == "finished":
+                self.finished_signal.emit()
+                break
+
+    @Slot(int, list, tuple)
+    def _on_ring_ready(self, gen, names, shape):
+        self.frame_image = None
+        self.reader.attach(gen, names, shape)
+
+    @Slot()
+    def _on_frame_ready(self):
+        got = self.reader.acquire()
+        if got is None:
+            return  # 已被之前的通知取走，或帧环正在重建
+        rgb, _ = got
+        h, w = rgb.shape[:2]
+        self.frame_image = QImage(rgb.data, w, h, w * 3, QImage.Format_RGB888)
+        self.frame_signal.emit(self.frame_image)
+
+    @Slot(str, bool)
+    def update_settings(self, key, value):
+        self.commands.put(("settings", key, value))
+
+    @Slot(str, list)
+    def update_roi(self, side, points):
+        self.commands.put(("roi", side, points))
+
+    @Slot(int)
+    def request_profile(self, frames):
+        self.commands.put(("profile", frames))
+
+    def stop(self):
+        if self.process is not None and self.process.is_alive():
+            self.commands.put(("stop",))
+            self.process.join(timeout=10)
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join()
+        self.wait()
+        self.frame_image = None
+        self.reader.close()
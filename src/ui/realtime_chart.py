@@ -0,0 +1,72 @@
+from collections import deque  # 用于存储最近 N 帧的数据
+
+# --- 📊 引入 Matplotlib ---
+# 只引入 Figure 与 Qt 画布，不引入 pyplot (pyplot 会额外加载整套交互后端，拖慢冷启动)
+# 本模块由后台加载线程导入，修改全局配置 (后端 / 样式) 的调用放到界面线程创建图表时进行
+import matplotlib
+from matplotlib import style
+from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.figure import Figure
+
+_style_applied = False
+
+
+def _apply_style():
+    global _style_applied
+    if not _style_applied:
+        matplotlib.use('QtAgg')  # 告诉 Matplotlib 使用 Qt 后端
+        style.use('dark_background')  # 设置 Matplotlib 的全局样式 (暗黑风格)
+        _style_applied = True
+
+
+class RealTimeChart(FigureCanvas):
+    """自定义的动态图表组件"""
+
+    def __init__(self, parent=None, width=5, height=2, dpi=100):
+        _apply_style()
+        # 创建画布，背景色设为深灰，去掉边框
+        self.fig = Figure(figsize=(width, height), dpi=dpi, facecolor='#1e1e1e')
+        self.ax = self.fig.add_subplot(111)
+        self.ax.set_facecolor('#1e1e1e')  # 坐标轴背景
+
+        super().__init__(self.fig)
+        self.setParent(parent)
+
+        # 数据容器 (只保留最近 50 个点)
+        self.max_len = 50
+        self.data_reach = deque([0] * self.max_len, maxlen=self.max_len)
+        self.data_bend = deque([0] * self.max_len, maxlen=self.max_len)
+
+        # 初始化两条曲线
+        # 黄线: 伸手, 红线: 弯腰
+        self.line_reach, = self.ax.plot([], [], 'o-', color='#ffaa00', linewidth=2, markersize=4, label='Reach')
+        self.line_bend, = self.ax.plot([], [], 'o-', color='#ff5555', linewidth=2, markersize=4, label='Bend')
+
+        # 设置坐标轴样式 (去刻度，留网格)
+        self.ax.grid(True, color='#333333', linestyle='--')
+        self.ax.spines['top'].set_visible(False)
+        self.ax.spines['right'].set_visible(False)
+        self.ax.spines['bottom'].set_color('#444')
+        self.ax.spines['left'].set_color('#444')
+        self.ax.tick_params(colors='#888')
+
+        # 设置Y轴范围 (自动适应或固定)
+        self.ax.set_ylim(-0.5, 5)
+        self.ax.legend(loc='upper left', facecolor='#1e1e1e', edgecolor='#333', labelcolor='#ccc', fontsize=8)
+
+    def update_chart(self, new_reach, new_bend):
+        """更新数据并重绘"""
+        self.data_reach.append(new_reach)
+        self.data_bend.append(new_bend)
+
+        x_data = range(len(self.data_reach))
+
+        self.line_reach.set_data(x_data, self.data_reach)
+        self.line_bend.set_data(x_data, self.data_bend)
+
+        # 动态调整 Y 轴 (如果数值超过当前范围)
+        max_val = max(max(self.data_reach), max(self.data_bend))
+        if max_val > self.ax.get_ylim()[1]:
+            self.ax.set_ylim(-0.5, max_val + 2)
+
+        self.draw()  # 重绘
@@ -0,0 +1,90 @@
+import importlib
+import time
+from PySide6.QtCore import QThread, Signal
+
+
+class BackgroundLoader(QThread):
+    """
+    后台初始化线程
+    窗口先显示，重量级依赖 (OpenCV / PyTorch / Ultralytics) 与模型加载放到这里完成，
+    通过 progress_signal 把当前阶段与进度推送给状态卡片。
+    """
+    progress_signal = Signal(str, int)  # (阶段描述, 进度百分比)
+    module_signal = Signal(str)  # 某个模块导入完成
+    loaded_signal = Signal(object)  # 加载结果 dict
+    failed_signal = Signal(str)
+
+    # (阶段描述, 模块名) —— 按依赖顺序逐个导入，便于统计各自耗时
+    IMPORT_STAGES = [
+        ("加载图表组件", "src.ui.realtime_chart"),
+        ("加载 OpenCV", "cv2"),
+        ("加载 PyTorch", "torch"),
+        ("加载 Ultralytics", "ultralytics"),
+        ("加载推理线程", "src.ui.ai_worker"),
+    ]
+
+    # 使用推理服务或子进程模式时本进程不需要 torch / ultralytics
+    LOCAL_ONLY_MODULES = ("torch", "ultralytics")
+
+    def __init__(self, model_path, server_url=None, process_mode=False, fixed_input_ok=True):
+        super().__init__()
+        self.model_path = model_path
+        self.server_url = server_url
+        self.process_mode = process_mode  # 分析流程放到子进程，模型也在子进程中加载
+        self.fixed_input_ok = fixed_input_ok  # 为 False 时 (级联 / 分块推理) 不换用标定档案中的导出权重
+        self.timings = {}  # 阶段 -> 耗时 (秒)
+
+    def run(self):
+        stages = [(label, m) for label, m in self.IMPORT_STAGES
+                  if not ((self.server_url or self.process_mode) and m in self.LOCAL_ONLY_MODULES)]
+        if self.process_mode:
+            stages.append(("加载子进程工作者", "src.ui.process_worker"))
+        total = len(stages) + 1
+        try:
+            for i, (label, module_name) in enumerate(stages):
+                self.progress_signal.emit(label, int(i * 100 / total))
+                t0 = time.perf_counter()
+                importlib.import_module(module_name)
+                self.timings[module_name] = time.perf_counter() - t0
+                self.module_signal.emit(module_name)
+
+            from src.ui.ai_worker import AIWorker
+
+            worker_cls = AIWorker
+            if self.process_mode:
+                from src.ui.process_worker import ProcessWorker
+                worker_cls = ProcessWorker
+
+            if self.server_url:
+                self.progress_signal.emit("连接推理服务", int(len(stages) * 100 / total))
+                from src.inference_client import PoseClient
+
+                t0 = time.perf_counter()
+                client = PoseClient(self.server_url)
+                client.health()
+                self.timings["server"] = time.perf_counter() - t0
+                self.progress_signal.emit("就绪", 100)
+                self.loaded_signal.emit({"worker_cls": worker_cls, "detector": client, "device": self.server_url})
+                return
+
+            if self.process_mode:
+                self.progress_signal.emit("就绪", 100)
+                self.loaded_signal.emit({"worker_cls": worker_cls, "detector": None, "device": "子进程"})
+                return
+
+            self.progress_signal.emit("加载模型", int(len(stages) * 100 / total))
+            import torch
+            from src.core_inference import PoseDetector
+
+            from src.runtime_profile import load_runtime_profile, resolve_model
+
+            device = 'cuda' if torch.cuda.is_available() else 'cpu'
+            t0 = time.perf_counter()
+            weights = resolve_model(self.model_path, load_runtime_profile(), self.fixed_input_ok)
+            detector = PoseDetector(weights, device=device)
+            self.timings["model"] = time.perf_counter() - t0
+
+            self.progress_signal.emit("就绪", 100)
+            self.loaded_signal.emit({"worker_cls": AIWorker, "detector": detector, "device": device})
+        except Exception as e:
+            self.failed_signal.emit(str(e))